@@ -0,0 +1,207 @@
+"""
+On-disk cache of Opus encoded audio for frequently played tracks
+"""
+import asyncio
+import hashlib
+import os
+from collections import OrderedDict
+from bot.track_cache import TrackCache
+from utils.logger import setup_logger
+from config import Config
+
+logger = setup_logger(__name__)
+
+class AudioCache:
+    """Size bounded LRU directory of Ogg Opus files
+
+    A track is transcoded in the background once it has been played
+    hot_plays times; later plays read the file with Opus passthrough, so
+    they need neither a network fetch nor an encode. Disabled when no
+    directory is configured.
+    """
+
+    # Play counters kept for tracks that are not cached yet
+    MAX_TRACKED_PLAYS = 10000
+
+    def __init__(self, directory, max_bytes, hot_plays, max_duration, bitrate, max_jobs):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hot_plays = hot_plays
+        self.max_duration = max_duration
+        self.bitrate = bitrate
+        self.max_jobs = max_jobs
+        # key -> file size, least recently played first
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._plays = OrderedDict()
+        self._jobs = {}
+
+        # Cache statistics
+        self.hits = 0
+        self.misses = 0
+        self.transcodes = 0
+        self.failed = 0
+        self.evictions = 0
+
+        if self.enabled:
+            self._load()
+
+    @property
+    def enabled(self):
+        return bool(self.directory)
+
+    def _load(self):
+        """Index files left by a previous run, oldest first"""
+        os.makedirs(self.directory, exist_ok=True)
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.part'):
+                # Interrupted transcode
+                os.remove(entry.path)
+            elif entry.name.endswith('.ogg'):
+                stat = entry.stat()
+                files.append((stat.st_mtime, entry.name[:-4], stat.st_size))
+
+        for _, key, size in sorted(files):
+            self._entries[key] = size
+            self._bytes += size
+        self._evict()
+        logger.info(f"Audio cache: {len(self._entries)} files ({self._bytes / 1048576:.1f} MB) in {self.directory}")
+
+    @staticmethod
+    def key(webpage_url):
+        """File name stem for a track"""
+        return hashlib.sha1(TrackCache.normalize(webpage_url).encode()).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, f"{key}.ogg")
+
+    def contains(self, webpage_url):
+        """Whether a track is cached, without counting a lookup"""
+        return self.enabled and bool(webpage_url) and self.key(webpage_url) in self._entries
+
+    def get(self, webpage_url):
+        """Path of a cached track's Opus file, or None"""
+        if not self.enabled or not webpage_url:
+            return None
+        key = self.key(webpage_url)
+        if key not in self._entries:
+            self.misses += 1
+            return None
+
+        path = self.path(key)
+        try:
+            # The mtime orders the LRU across restarts
+            os.utime(path)
+        except OSError:
+            # Removed behind our back
+            self._bytes -= self._entries.pop(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return path
+
+    def record_play(self, webpage_url, stream_url, duration):
+        """Count a streamed play, caching the track once it is hot"""
+        if not self.enabled or not webpage_url or not stream_url:
+            return
+        if not duration or duration > self.max_duration:
+            # Live streams and very long tracks are not worth the space
+            return
+
+        key = self.key(webpage_url)
+        if key in self._entries or key in self._jobs:
+            return
+
+        plays = self._plays.pop(key, 0) + 1
+        if plays < self.hot_plays or len(self._jobs) >= self.max_jobs:
+            self._plays[key] = plays
+            while len(self._plays) > self.MAX_TRACKED_PLAYS:
+                self._plays.popitem(last=False)
+            return
+
+        self._jobs[key] = asyncio.get_running_loop().create_task(self._transcode(key, stream_url))
+
+    async def _transcode(self, key, stream_url):
+        """Encode a stream to Opus next to the cache, then move it into place"""
+        path = self.path(key)
+        partial = f"{path}.part"
+        try:
+            process = await asyncio.create_subprocess_exec(
+                'ffmpeg', '-nostdin', '-loglevel', 'error',
+                *Config.FFMPEG_OPTIONS['before_options'].split(),
+                '-i', stream_url,
+                '-vn', '-map', '0:a:0',
+                '-c:a', 'libopus', '-b:a', self.bitrate, '-ar', '48000', '-ac', '2',
+                '-f', 'ogg', '-y', partial,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE
+            )
+            _, stderr = await process.communicate()
+            if process.returncode != 0:
+                raise RuntimeError(stderr.decode(errors='replace').strip() or f"ffmpeg exited with {process.returncode}")
+
+            os.replace(partial, path)
+            size = os.path.getsize(path)
+            self._entries[key] = size
+            self._bytes += size
+            self.transcodes += 1
+            self._evict()
+            logger.info(f"Cached audio {key} ({size / 1048576:.1f} MB)")
+        except asyncio.CancelledError:
+            self._discard(partial)
+            raise
+        except Exception as e:
+            self.failed += 1
+            self._discard(partial)
+            logger.error(f"Error caching audio {key}: {e}")
+        finally:
+            del self._jobs[key]
+
+    @staticmethod
+    def _discard(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _evict(self):
+        """Remove least recently played files until under the size limit"""
+        while self._bytes > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+            self._discard(self.path(key))
+
+    def shutdown(self):
+        """Cancel running transcodes"""
+        for task in self._jobs.values():
+            task.cancel()
+
+    def get_stats(self):
+        """Get cache statistics"""
+        lookups = self.hits + self.misses
+        return {
+            'enabled': self.enabled,
+            'files': len(self._entries),
+            'bytes': self._bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'transcodes': self.transcodes,
+            'transcoding': len(self._jobs),
+            'failed': self.failed,
+            'evictions': self.evictions
+        }
+
+# Global audio cache shared by every guild's player
+audio_cache = AudioCache(
+    Config.AUDIO_CACHE_DIR,
+    Config.AUDIO_CACHE_MAX_MB * 1048576,
+    Config.AUDIO_CACHE_HOT_PLAYS,
+    Config.AUDIO_CACHE_MAX_DURATION,
+    Config.AUDIO_CACHE_BITRATE,
+    Config.AUDIO_CACHE_MAX_JOBS
+)
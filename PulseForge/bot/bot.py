@@ -1,9 +1,11 @@
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 import asyncio
-from datetime import datetime, timedelta
-from collections import defaultdict
+from datetime import datetime
+from bot import live_state
 from bot.database import db
+from bot.event_bus import activity_bus
+from bot.ratelimit import RateLimit, RateLimitEngine
 from utils.logger import setup_logger
 from config import Config
 
@@ -24,7 +26,8 @@ class PulseForgeBot(commands.Bot):
         )
         
         # Rate limiting
-        self.command_cooldowns = defaultdict(lambda: defaultdict(list))
+        self.rate_limiter = self.create_rate_limiter()
+        self.add_check(self.rate_limit_check)
         
         # Bot statistics
         self.start_time = None
@@ -38,11 +41,76 @@ class PulseForgeBot(commands.Bot):
         if not message.guild:
             return Config.COMMAND_PREFIX
         
-        settings = db.get_server_settings(message.guild.id)
+        settings = await db.aget_server_settings(message.guild.id)
         if settings:
             return settings.get('prefix', Config.COMMAND_PREFIX)
         return Config.COMMAND_PREFIX
     
+    @staticmethod
+    def create_rate_limiter():
+        """Build the rate limit engine from Config"""
+        command_limits = {}
+        for entry in filter(None, Config.COMMAND_RATE_LIMITS.split(',')):
+            try:
+                name, spec = entry.split('=')
+                command_limits[name.strip()] = RateLimit.parse(spec.strip())
+            except ValueError:
+                logger.warning(f"Ignoring invalid COMMAND_RATE_LIMITS entry: {entry}")
+        
+        try:
+            user_limit = RateLimit(Config.COMMANDS_PER_MINUTE, 60)
+        except ValueError:
+            logger.warning(f"Invalid COMMANDS_PER_MINUTE {Config.COMMANDS_PER_MINUTE}, using 10")
+            user_limit = RateLimit(10, 60)
+        
+        return RateLimitEngine(
+            user_limit=user_limit,
+            guild_limit=RateLimit(Config.GUILD_COMMANDS_PER_MINUTE, 60) if Config.GUILD_COMMANDS_PER_MINUTE > 0 else None,
+            global_limit=RateLimit(Config.GLOBAL_COMMANDS_PER_SECOND, 1) if Config.GLOBAL_COMMANDS_PER_SECOND > 0 else None,
+            command_limits=command_limits,
+            max_keys=Config.RATE_LIMIT_MAX_KEYS
+        )
+    
+    async def rate_limit_check(self, ctx):
+        """Global command check enforcing the rate limits"""
+        guild_id = ctx.guild.id if ctx.guild else None
+        command_name = ctx.command.qualified_name if ctx.command else None
+        scope, retry_after = self.rate_limiter.check(ctx.author.id, guild_id, command_name)
+        if scope is None:
+            return True
+        
+        limit = self.rate_limiter.get_limit(scope, command_name)
+        bucket = {
+            'command': commands.BucketType.member,
+            'user': commands.BucketType.member,
+            'guild': commands.BucketType.guild,
+            'global': commands.BucketType.default
+        }[scope]
+        raise commands.CommandOnCooldown(commands.Cooldown(limit.rate, limit.per), retry_after, bucket)
+    
+    async def setup_hook(self):
+        """Start background tasks once the bot has an event loop"""
+        self.sweep_rate_limits.change_interval(seconds=Config.RATE_LIMIT_SWEEP_INTERVAL)
+        self.sweep_rate_limits.start()
+        self.publish_live_state.change_interval(seconds=Config.LIVE_STATE_INTERVAL)
+        self.publish_live_state.start()
+    
+    @tasks.loop(seconds=60)
+    async def sweep_rate_limits(self):
+        """Periodically drop rate limit state for idle users"""
+        removed = self.rate_limiter.sweep()
+        if removed:
+            logger.debug(f"Rate limit sweep removed {removed} idle keys")
+    
+    @tasks.loop(seconds=5)
+    async def publish_live_state(self):
+        """Publish a fresh snapshot of guilds, latency and voice sessions"""
+        live_state.publish(live_state.snapshot_bot(self))
+    
+    @publish_live_state.before_loop
+    async def before_publish_live_state(self):
+        await self.wait_until_ready()
+    
     def load_cogs(self):
         """Load all bot cogs"""
         cogs = [
@@ -62,6 +130,7 @@ class PulseForgeBot(commands.Bot):
     async def on_ready(self):
         """Bot ready event"""
         self.start_time = datetime.utcnow()
+        live_state.publish(live_state.snapshot_bot(self))
         logger.info(f"{self.user} has connected to Discord!")
         logger.info(f"Bot is in {len(self.guilds)} guilds")
         
@@ -84,12 +153,15 @@ class PulseForgeBot(commands.Bot):
         """Bot joined a new guild"""
         logger.info(f"Joined guild: {guild.name} ({guild.id})")
         
+        live_state.publish(live_state.snapshot_bot(self))
+        
         # Initialize server settings
-        db.update_server_settings(guild.id, prefix=Config.COMMAND_PREFIX)
+        await db.aupdate_server_settings(guild.id, prefix=Config.COMMAND_PREFIX)
     
     async def on_guild_remove(self, guild):
         """Bot left a guild"""
         logger.info(f"Left guild: {guild.name} ({guild.id})")
+        live_state.publish(live_state.snapshot_bot(self))
     
     async def on_command(self, ctx):
         """Command used event"""
@@ -97,10 +169,28 @@ class PulseForgeBot(commands.Bot):
         
         # Log command usage
         if ctx.guild:
-            db.log_command_usage(ctx.guild.id, ctx.author.id, ctx.command.name)
+            await db.alog_command_usage(ctx.guild.id, ctx.author.id, ctx.command.name)
+        
+        # Push to live dashboards
+        activity_bus.publish(
+            'command',
+            command=ctx.command.name,
+            guild_id=ctx.guild.id if ctx.guild else None,
+            user_id=ctx.author.id
+        )
         
         logger.info(f"Command used: {ctx.command.name} by {ctx.author} in {ctx.guild}")
     
+    async def close(self):
+        """Flush buffered statistics before shutting down"""
+        self.publish_live_state.cancel()
+        live_state.publish(live_state.OFFLINE)
+        try:
+            await db.aflush()
+        except Exception as e:
+            logger.error(f"Failed to flush database buffer on shutdown: {e}")
+        await super().close()
+    
     async def on_command_error(self, ctx, error):
         """Handle command errors"""
         if isinstance(error, commands.CommandNotFound):
@@ -121,24 +211,10 @@ class PulseForgeBot(commands.Bot):
         logger.error(f"Command error in {ctx.command}: {error}")
         await ctx.send("❌ An error occurred while processing the command.")
     
-    def check_rate_limit(self, user_id, guild_id=None):
-        """Check if user is rate limited"""
-        now = datetime.utcnow()
-        key = f"{user_id}_{guild_id}" if guild_id else str(user_id)
-        
-        # Clean old entries
-        self.command_cooldowns[key] = [
-            timestamp for timestamp in self.command_cooldowns[key]
-            if now - timestamp < timedelta(minutes=1)
-        ]
-        
-        # Check rate limit
-        if len(self.command_cooldowns[key]) >= Config.COMMANDS_PER_MINUTE:
-            return False
-        
-        # Add current timestamp
-        self.command_cooldowns[key].append(now)
-        return True
+    def check_rate_limit(self, user_id, guild_id=None, command_name=None):
+        """Check if user is rate limited; counts the request when allowed"""
+        scope, retry_after = self.rate_limiter.check(user_id, guild_id, command_name)
+        return scope is None
     
     def get_uptime(self):
         """Get bot uptime"""
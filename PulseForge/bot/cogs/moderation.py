@@ -72,7 +72,7 @@ class Moderation(commands.Cog):
             await ctx.send(embed=embed)
             
             # Log to moderation channel if set
-            settings = db.get_server_settings(ctx.guild.id)
+            settings = await db.aget_server_settings(ctx.guild.id)
             if settings and settings.get('mod_channel_id'):
                 mod_channel = self.bot.get_channel(settings['mod_channel_id'])
                 if mod_channel:
@@ -215,10 +215,10 @@ class Moderation(commands.Cog):
             return
         
         # Add warning to database
-        db.add_warning(ctx.guild.id, member.id, ctx.author.id, reason)
+        await db.aadd_warning(ctx.guild.id, member.id, ctx.author.id, reason)
         
         # Get warning count
-        warnings = db.get_warnings(ctx.guild.id, member.id)
+        warnings = await db.aget_warnings(ctx.guild.id, member.id)
         warning_count = len(warnings)
         
         embed = discord.Embed(
@@ -254,7 +254,7 @@ class Moderation(commands.Cog):
         if not member:
             member = ctx.author
         
-        warnings = db.get_warnings(ctx.guild.id, member.id)
+        warnings = await db.aget_warnings(ctx.guild.id, member.id)
         
         if not warnings:
             await ctx.send(f"✅ {member.mention} has no warnings.")
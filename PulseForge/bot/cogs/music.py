@@ -1,10 +1,14 @@
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands
 import asyncio
-import yt_dlp
-from collections import deque
+import time
+from bot.audio_cache import audio_cache
 from bot.database import db
+from bot.extraction import ExtractionCancelled, ExtractionPool
+from bot.music_queue import Track, TrackQueue
+from bot.playback import MeteredSource, ffmpeg_process, playback_meter, unwrap
+from bot.track_cache import track_cache
 from utils.logger import setup_logger
 from config import Config
 
@@ -24,18 +28,30 @@ class YTDLSource:
         'quiet': True,
         'no_warnings': True,
         'default_search': 'auto',
-        'source_address': '0.0.0.0'
+        'source_address': '0.0.0.0',
+        'socket_timeout': 15
     }
     
-    ytdl = yt_dlp.YoutubeDL(ytdl_format_options)
+    # Dedicated workers, each with its own YoutubeDL instance
+    pool = ExtractionPool(
+        ytdl_format_options,
+        workers=Config.EXTRACTION_WORKERS,
+        timeout=Config.EXTRACTION_TIMEOUT,
+        max_queue=Config.EXTRACTION_MAX_QUEUE
+    )
     
     @classmethod
-    async def from_url(cls, url, *, loop=None):
-        """Create source from URL"""
-        loop = loop or asyncio.get_event_loop()
-        
+    async def from_url(cls, url, *, guild_id=None, requester_id=None):
+        """Create source from URL, sharing resolved tracks across guilds"""
+        return await track_cache.resolve(
+            url, lambda query: cls.extract(query, guild_id=guild_id, requester_id=requester_id)
+        )
+    
+    @classmethod
+    async def extract(cls, url, *, guild_id=None, requester_id=None):
+        """Run yt-dlp extraction for a URL or search query"""
         try:
-            data = await loop.run_in_executor(None, lambda: cls.ytdl.extract_info(url, download=False))
+            data = await cls.pool.extract(url, guild_id, requester_id)
             
             if data is None:
                 return None
@@ -51,11 +67,64 @@ class YTDLSource:
                 'title': data.get('title', 'Unknown'),
                 'duration': data.get('duration', 0),
                 'webpage_url': data.get('webpage_url', ''),
-                'thumbnail': data.get('thumbnail')
+                'thumbnail': data.get('thumbnail'),
+                'codec': data.get('acodec')
             }
+        except ExtractionCancelled:
+            raise
+        except asyncio.TimeoutError:
+            logger.error(f"Timed out extracting audio info for {url}")
+            return None
         except Exception as e:
             logger.error(f"Error extracting audio info: {e}")
             return None
+    
+    @classmethod
+    async def from_playlist(cls, url, *, guild_id=None, requester_id=None):
+        """Flat-extract a playlist into unresolved tracks
+
+        Only metadata is fetched; stream URLs are resolved just before
+        each track plays.
+        """
+        options = {
+            'extract_flat': 'in_playlist',
+            'noplaylist': False,
+            'playlistend': Config.MUSIC_PLAYLIST_MAX_TRACKS
+        }
+        try:
+            data = await cls.pool.extract(url, guild_id, requester_id, options=options)
+        except ExtractionCancelled:
+            raise
+        except asyncio.TimeoutError:
+            logger.error(f"Timed out extracting playlist {url}")
+            return None
+        except Exception as e:
+            logger.error(f"Error extracting playlist: {e}")
+            return None
+        
+        if not isinstance(data, dict) or not data.get('entries'):
+            return None
+        
+        tracks = []
+        for entry in data['entries']:
+            if not isinstance(entry, dict):
+                continue
+            webpage_url = entry.get('webpage_url') or entry.get('url')
+            if not webpage_url and entry.get('id'):
+                webpage_url = f"https://www.youtube.com/watch?v={entry['id']}"
+            if not webpage_url:
+                continue
+            tracks.append({
+                'title': entry.get('title') or 'Unknown',
+                'duration': entry.get('duration'),
+                'webpage_url': webpage_url
+            })
+        
+        return {
+            'title': data.get('title', 'Playlist'),
+            'webpage_url': data.get('webpage_url', url),
+            'tracks': tracks
+        }
 
 class MusicPlayer:
     """Music player for a guild"""
@@ -63,79 +132,421 @@ class MusicPlayer:
     def __init__(self, bot, guild_id):
         self.bot = bot
         self.guild_id = guild_id
-        self.queue = deque()
+        self.queue = TrackQueue()
         self.current = None
+        # Audio cache file the current track plays from, if any
+        self.current_cached = None
         self.voice_client = None
-        self.volume = 0.5
+        self.volume = Config.MUSIC_DEFAULT_VOLUME / 100.0
         self.loop = False
+        self.prefetch_task = None
+        # Monotonic time of the last playback or queue activity
+        self.last_active = time.monotonic()
+        # When the voice channel was first seen without listeners
+        self.empty_since = None
+        # Queue persistence: ids of saved rows, and whether the saved
+        # snapshot has been loaded (nothing is written until it has)
+        self.next_item_id = 1
+        self.restored = False
+        # Held for the whole load so commands arriving meanwhile wait for it
+        self.restore_lock = asyncio.Lock()
+        # Playback state machine: 'idle' -> 'starting' -> 'playing' -> 'idle'.
+        # Every transition runs on the event task, one event at a time
+        self.state = 'idle'
+        self.events = asyncio.Queue()
+        self.event_task = None
+        # Set by cleanup; a closed player ignores late events from the
+        # voice client, such as the after callback fired by stop()
+        self.closed = False
+        
+    def touch(self):
+        """Mark the player as active"""
+        self.last_active = time.monotonic()
+    
+    def idle_for(self, now):
+        """Seconds since the player last did anything"""
+        if self.voice_client and self.voice_client.is_playing():
+            self.last_active = now
+        return now - self.last_active
+    
+    def cleanup(self, forget=True):
+        """Release the queue, current track and background work
+        
+        With forget the saved snapshot is dropped too; otherwise it is
+        kept for the next session.
+        """
+        self.closed = True
+        if self.prefetch_task and not self.prefetch_task.done():
+            self.prefetch_task.cancel()
+        self.prefetch_task = None
+        if self.event_task and not self.event_task.done():
+            self.event_task.cancel()
+        self.event_task = None
+        self.state = 'idle'
+        if forget and self.restored:
+            db.defer_write(db.clear_saved_queue, self.guild_id)
+        self.queue.clear()
+        self.current = None
+        self.current_cached = None
+        self.voice_client = None
+    
+    async def restore(self):
+        """Load the saved queue the first time the guild uses music
         
+        Only re-resolvable metadata is saved; stream URLs are resolved as
+        tracks come up for playback, so a restart costs no extractions.
+        Concurrent callers wait for the load, so no track is queued (and
+        given an item id) before the saved ids are known.
+        """
+        async with self.restore_lock:
+            if self.restored:
+                return
+            try:
+                state, rows = await db.aload_saved_queue(self.guild_id)
+            except Exception as e:
+                # Stay unrestored: saving now could overwrite the stored rows
+                logger.error(f"Error loading saved queue for guild {self.guild_id}: {e}")
+                return
+            self.restored = True
+            if state or rows:
+                self._apply_saved(state, rows)
+    
+    def _apply_saved(self, state, rows):
+        """Queue the tracks of a loaded snapshot and continue its item ids"""
+        tracks = [Track.from_saved(row) for row in rows]
+        if state:
+            self.volume = state['volume']
+            # The interrupted track starts over from the front of the queue
+            current_id = state['current_item_id']
+            tracks.sort(key=lambda track: track.item_id != current_id)
+        
+        for track in tracks:
+            self.queue.append(track)
+        self.next_item_id = max((track.item_id for track in tracks), default=0) + 1
+        if state and state['current_item_id'] is not None:
+            self.save_state(None)
+            if len(tracks) > 1 and tracks[0].position >= tracks[1].position:
+                self.renumber_queue()
+        
+        logger.info(f"Restored {len(tracks)} queued tracks for guild {self.guild_id}")
+    
+    def _place(self, track):
+        """Give a track appended to the queue its id and ordering key"""
+        track.item_id = self.next_item_id
+        self.next_item_id += 1
+        last = self.queue[-1] if self.queue else self.current
+        track.position = (last.position + 1.0) if last and last.position is not None else 1.0
+    
+    def save_state(self, current, finished=None):
+        """Persist volume and the playing track, dropping the finished one"""
+        if self.restored:
+            db.defer_write(
+                db.save_player_state, self.guild_id, self.volume,
+                current.item_id if current else None,
+                finished.item_id if finished else None
+            )
+    
+    def set_current(self, track):
+        """Make track the playing one; the previous one is finished"""
+        finished, self.current = self.current, track
+        self.save_state(track, finished)
+    
     def add_to_queue(self, track):
         """Add track to queue"""
-        self.queue.append(track)
+        self.extend_queue([track])
+    
+    def extend_queue(self, tracks):
+        """Add tracks to the queue, saving them in one write"""
+        self.touch()
+        was_short = len(self.queue) < Config.MUSIC_PREFETCH_COUNT
+        for track in tracks:
+            self._place(track)
+            self.queue.append(track)
+        if self.restored:
+            db.defer_write(db.save_queue_items, self.guild_id, [track.saved_row() for track in tracks])
+        if was_short:
+            self.schedule_prefetch()
+    
+    @staticmethod
+    def is_fresh(track):
+        """Whether a track's stream URL will outlive its playback"""
+        if not track.url:
+            return False
+        if track.expires_at is None:
+            return True
+        return track.expires_at > time.time() + track.duration
+    
+    async def ensure_fresh(self, track):
+        """Re-resolve a track whose stream URL is missing or about to expire"""
+        if self.is_fresh(track):
+            return True
+        
+        query = track.webpage_url or track.title
+        if not query:
+            return False
+        
+        track_cache.invalidate(query)
+        try:
+            resolved = await YTDLSource.from_url(query, guild_id=self.guild_id)
+        except ExtractionCancelled:
+            return False
+        if not resolved or not resolved.get('url'):
+            logger.warning(f"Could not re-resolve track: {track.title}")
+            return False
+        
+        track.url = resolved['url']
+        track.expires_at = resolved.get('expires_at')
+        track.codec = resolved.get('codec')
+        return True
+    
+    def schedule_prefetch(self):
+        """Start warming the next queued tracks unless already doing so"""
+        if self.prefetch_task and not self.prefetch_task.done():
+            return
+        self.prefetch_task = self.bot.loop.create_task(self.prefetch())
+    
+    async def prefetch(self):
+        """Resolve the next few queued tracks while the current one plays"""
+        for track in self.queue.slice(0, Config.MUSIC_PREFETCH_COUNT):
+            if audio_cache.contains(track.webpage_url):
+                continue
+            try:
+                await self.ensure_fresh(track)
+            except Exception as e:
+                logger.error(f"Error prefetching track: {e}")
     
     def remove_from_queue(self, index):
         """Remove track from queue by index"""
         if 0 <= index < len(self.queue):
-            queue_list = list(self.queue)
-            removed = queue_list.pop(index)
-            self.queue = deque(queue_list)
-            return removed
+            track = self.queue.pop(index)
+            if self.restored:
+                db.defer_write(db.delete_queue_items, self.guild_id, [track.item_id])
+            return track
         return None
     
+    def move_in_queue(self, source, destination):
+        """Move a queued track to a new position"""
+        if not 0 <= source < len(self.queue):
+            return None
+        
+        track = self.queue.move(source, destination)
+        index = max(0, min(destination, len(self.queue) - 1))
+        before = self.queue[index - 1].position if index > 0 else None
+        after = self.queue[index + 1].position if index + 1 < len(self.queue) else None
+        
+        # Slot the ordering key between the new neighbours
+        if before is None and after is None:
+            position = 1.0
+        elif before is None:
+            position = after - 1.0
+        elif after is None:
+            position = before + 1.0
+        else:
+            position = (before + after) / 2
+        
+        if (before is not None and position <= before) or (after is not None and position >= after):
+            # Repeated moves into one gap exhausted float precision
+            self.renumber_queue()
+        else:
+            track.position = position
+            if self.restored:
+                db.defer_write(db.update_queue_positions, self.guild_id, [(track.item_id, position)])
+        
+        if index < Config.MUSIC_PREFETCH_COUNT:
+            self.schedule_prefetch()
+        return track
+    
+    def renumber_queue(self):
+        """Rewrite every ordering key to match the queue order"""
+        positions = []
+        for i, track in enumerate(self.queue, start=1):
+            track.position = float(i)
+            positions.append((track.item_id, track.position))
+        if self.restored:
+            db.defer_write(db.update_queue_positions, self.guild_id, positions)
+    
     def clear_queue(self):
         """Clear the queue"""
+        if self.restored and self.queue:
+            db.defer_write(db.delete_queue_items, self.guild_id, [track.item_id for track in self.queue])
         self.queue.clear()
     
     def shuffle_queue(self):
         """Shuffle the queue"""
-        import random
-        queue_list = list(self.queue)
-        random.shuffle(queue_list)
-        self.queue = deque(queue_list)
+        self.queue.shuffle()
+        self.renumber_queue()
+        self.schedule_prefetch()
+    
+    def create_source(self, cached_path=None, offset=0.0):
+        """Build a metered audio source for the current track, offset seconds in
+        
+        Opus sources at full volume are copied straight through; otherwise
+        FFmpeg applies the volume and encodes Opus itself, so the player
+        thread only forwards packets. The PCM path decodes in FFmpeg and
+        scales and encodes every frame in Python.
+        """
+        if cached_path:
+            # Cached files are Opus already and need no reconnect options
+            path, before_options, is_opus = cached_path, '', True
+        else:
+            path = self.current.url
+            before_options = Config.FFMPEG_OPTIONS['before_options']
+            is_opus = self.current.codec == 'opus'
+        if offset:
+            before_options = f"-ss {offset:.2f} {before_options}"
+        before_options = before_options.strip() or None
+        
+        if Config.MUSIC_PLAYBACK_MODE == 'opus':
+            if is_opus and self.volume == 1.0:
+                mode = 'opus-copy'
+                source = discord.FFmpegOpusAudio(
+                    path, codec='copy', before_options=before_options, options='-vn'
+                )
+            else:
+                mode = 'opus-filter'
+                source = discord.FFmpegOpusAudio(
+                    path, before_options=before_options,
+                    options=f"-vn -filter:a volume={self.volume:.2f}"
+                )
+        else:
+            mode = 'pcm'
+            source = discord.FFmpegPCMAudio(
+                path, before_options=before_options, options=Config.FFMPEG_OPTIONS['options']
+            )
+            # Apply volume
+            source = discord.PCMVolumeTransformer(source, volume=self.volume)
+        
+        return MeteredSource(source, mode, playback_meter, offset)
+    
+    def set_volume(self, volume):
+        """Change the volume; returns False if it only applies from the next song"""
+        self.volume = volume
+        self.save_state(self.current)
+        source = self.voice_client.source if self.voice_client else None
+        for inner in unwrap(source):
+            if isinstance(inner, discord.PCMVolumeTransformer):
+                inner.volume = volume
+                return True
+        if isinstance(source, MeteredSource):
+            # Opus sources have their volume fixed when FFmpeg starts
+            return self.restart_source(source)
+        return True
+    
+    def restart_source(self, old):
+        """Replace the playing source with a new one at the same position"""
+        playing = self.voice_client.is_playing() or self.voice_client.is_paused()
+        if not self.current or not playing:
+            # Playback already ended; the next song starts with the new volume
+            return True
+        
+        try:
+            source = self.create_source(self.current_cached, offset=old.position)
+        except Exception as e:
+            logger.error(f"Error restarting audio source in guild {self.guild_id}: {e}")
+            return False
+        
+        paused = self.voice_client.is_paused()
+        # Swapping keeps the after callback and resumes the audio thread
+        self.voice_client.source = source
+        if paused:
+            self.voice_client.pause()
+        
+        # The audio thread may still be inside a read of the old source;
+        # give it a moment before killing that FFmpeg process
+        loop = self.bot.loop
+        loop.call_later(1.0, loop.run_in_executor, None, old.cleanup)
+        return True
+    
+    def post(self, event, *args):
+        """Queue a playback event; must be called on the event loop"""
+        if self.closed:
+            return
+        if self.event_task is None or self.event_task.done():
+            self.event_task = self.bot.loop.create_task(self.run_events())
+        self.events.put_nowait((event, args))
+    
+    def start(self):
+        """Start playback unless something is already playing"""
+        self.post('start')
+    
+    async def run_events(self):
+        """Apply playback events in order"""
+        while True:
+            event, args = await self.events.get()
+            try:
+                if event == 'start':
+                    busy = self.voice_client and (self.voice_client.is_playing() or self.voice_client.is_paused())
+                    if self.state == 'idle' and not busy:
+                        await self.play_next()
+                elif event == 'finished':
+                    await self.on_track_finished(*args)
+            except Exception as e:
+                logger.error(f"Error handling playback event '{event}' in guild {self.guild_id}: {e}")
+                self.state = 'idle'
+    
+    async def on_track_finished(self, track, error):
+        """Record the finished track and move on to the next one"""
+        if self.closed:
+            return
+        if error:
+            logger.error(f"Player error: {error}")
+        else:
+            await db.aadd_music_history(
+                self.guild_id, track.requester_id, track.title, track.webpage_url, track.duration
+            )
+        self.state = 'idle'
+        await self.play_next()
     
     async def play_next(self):
         """Play next song in queue"""
+        self.touch()
         if not self.queue and not self.loop:
+            if self.current:
+                self.set_current(None)
             return
         
-        if self.queue:
-            self.current = self.queue.popleft()
-        elif self.loop and self.current:
-            pass  # Keep current song for looping
+        self.state = 'starting'
+        while True:
+            if self.queue:
+                self.set_current(self.queue.popleft())
+            elif self.loop and self.current:
+                pass  # Keep current song for looping
+            
+            # Cached tracks play from disk; otherwise never hand FFmpeg a
+            # stale stream URL, and skip tracks that are gone
+            cached_path = audio_cache.get(self.current.webpage_url) if self.current else None
+            if not self.current or cached_path or await self.ensure_fresh(self.current):
+                break
+            self.set_current(None)
+            if not self.queue:
+                self.state = 'idle'
+                return
         
+        self.state = 'idle'
         if self.current and self.voice_client:
             try:
-                source = discord.FFmpegPCMAudio(
-                    self.current['url'],
-                    before_options=Config.FFMPEG_OPTIONS['before_options'],
-                    options=Config.FFMPEG_OPTIONS['options']
-                )
-                
-                # Apply volume
-                source = discord.PCMVolumeTransformer(source, volume=self.volume)
+                source = self.create_source(cached_path)
+                self.current_cached = cached_path
+                track = self.current
+                loop = self.bot.loop
                 
                 def after_playing(error):
-                    if error:
-                        logger.error(f"Player error: {error}")
-                    else:
-                        # Add to history
-                        if self.current:
-                            db.add_music_history(
-                                self.guild_id,
-                                self.current.get('requester_id', 0),
-                                self.current.get('title', 'Unknown'),
-                                self.current.get('webpage_url', ''),
-                                self.current.get('duration', 0)
-                            )
-                    
-                    coro = self.play_next()
-                    fut = asyncio.run_coroutine_threadsafe(coro, self.bot.loop)
+                    # Runs on the audio thread: hand off and return at once.
+                    # Teardown stops the track too; that is not a finished song
+                    if self.closed:
+                        return
                     try:
-                        fut.result()
-                    except Exception as e:
-                        logger.error(f"Error in after_playing: {e}")
+                        loop.call_soon_threadsafe(self.post, 'finished', track, error)
+                    except RuntimeError:
+                        pass  # Event loop already closed during shutdown
                 
                 self.voice_client.play(source, after=after_playing)
+                self.state = 'playing'
+                if not cached_path:
+                    audio_cache.record_play(self.current.webpage_url, self.current.url, self.current.duration)
+                
+                # Warm the upcoming tracks while this one plays
+                self.schedule_prefetch()
                 
             except Exception as e:
                 logger.error(f"Error playing track: {e}")
@@ -144,6 +555,9 @@ class Music(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.players = {}
+        
+        # Reaper statistics
+        self.reaped = {'empty': 0, 'idle': 0, 'orphaned': 0}
     
     def get_player(self, guild_id):
         """Get or create music player for guild"""
@@ -151,6 +565,124 @@ class Music(commands.Cog):
             self.players[guild_id] = MusicPlayer(self.bot, guild_id)
         return self.players[guild_id]
     
+    async def cog_before_invoke(self, ctx):
+        """Rehydrate the guild's saved queue on its first music command"""
+        if ctx.guild:
+            await self.get_player(ctx.guild.id).restore()
+    
+    async def cog_load(self):
+        """Start the idle voice reaper"""
+        self.reap_idle.change_interval(seconds=Config.VOICE_REAP_INTERVAL)
+        self.reap_idle.start()
+    
+    def cog_unload(self):
+        """Stop background work when the cog is unloaded"""
+        self.reap_idle.cancel()
+        YTDLSource.pool.shutdown()
+        audio_cache.shutdown()
+    
+    async def destroy_player(self, guild_id, voice_client=None):
+        """Disconnect from voice and drop the guild's player"""
+        player = self.players.pop(guild_id, None)
+        voice_client = voice_client or (player.voice_client if player else None)
+        if player:
+            player.cleanup()
+        YTDLSource.pool.cancel(guild_id)
+        
+        if voice_client and voice_client.is_connected():
+            # Stopping kills the FFmpeg process before the socket goes away
+            voice_client.stop()
+            try:
+                await voice_client.disconnect()
+            except Exception as e:
+                logger.error(f"Error disconnecting from voice in guild {guild_id}: {e}")
+    
+    @tasks.loop(seconds=30)
+    async def reap_idle(self):
+        """Leave empty or idle voice channels and drop unused players"""
+        now = time.monotonic()
+        
+        for voice_client in list(self.bot.voice_clients):
+            guild_id = voice_client.guild.id
+            player = self.get_player(guild_id)
+            player.voice_client = voice_client
+            
+            listeners = [member for member in voice_client.channel.members if not member.bot]
+            if listeners:
+                player.empty_since = None
+            elif player.empty_since is None:
+                player.empty_since = now
+            
+            if player.empty_since is not None and now - player.empty_since >= Config.VOICE_EMPTY_TIMEOUT:
+                reason = 'empty'
+            elif player.idle_for(now) >= Config.VOICE_IDLE_TIMEOUT:
+                reason = 'idle'
+            else:
+                continue
+            
+            logger.info(f"Leaving {reason} voice channel in guild {guild_id}")
+            self.reaped[reason] += 1
+            await self.destroy_player(guild_id, voice_client)
+        
+        # Players left behind without a voice connection
+        connected = {voice_client.guild.id for voice_client in self.bot.voice_clients}
+        for guild_id, player in list(self.players.items()):
+            if guild_id not in connected and player.idle_for(now) >= Config.VOICE_IDLE_TIMEOUT:
+                self.reaped['orphaned'] += 1
+                await self.destroy_player(guild_id)
+    
+    @reap_idle.before_loop
+    async def before_reap_idle(self):
+        await self.bot.wait_until_ready()
+    
+    @reap_idle.error
+    async def reap_idle_error(self, error):
+        logger.error(f"Error reaping idle voice connections: {error}")
+    
+    @commands.Cog.listener()
+    async def on_voice_state_update(self, member, before, after):
+        """Cancel a member's pending searches when they leave voice"""
+        if member.id == self.bot.user.id:
+            # Disconnected from outside the bot (kicked, channel deleted)
+            # Shutting down also disconnects; keep the saved queue for the restart
+            if before.channel and not after.channel and not self.bot.is_closed():
+                await self.destroy_player(member.guild.id)
+            return
+        if member.bot or not before.channel or after.channel:
+            return
+        YTDLSource.pool.cancel(member.guild.id, member.id)
+    
+    def voice_stats(self):
+        """Count voice sessions and the FFmpeg processes feeding them"""
+        sessions = 0
+        playing = 0
+        ffmpeg = 0
+        for voice_client in self.bot.voice_clients:
+            sessions += 1
+            if voice_client.is_playing() or voice_client.is_paused():
+                playing += 1
+            process = ffmpeg_process(voice_client.source)
+            if process is not None and process.poll() is None:
+                ffmpeg += 1
+        return {
+            'voice_sessions': sessions,
+            'playing_sessions': playing,
+            'ffmpeg_processes': ffmpeg,
+            'reaped': dict(self.reaped)
+        }
+    
+    def get_stats(self):
+        """Get music subsystem statistics"""
+        return {
+            'players': len(self.players),
+            'queued_tracks': sum(len(player.queue) for player in self.players.values()),
+            'voice': self.voice_stats(),
+            'track_cache': track_cache.get_stats(),
+            'audio_cache': audio_cache.get_stats(),
+            'playback': playback_meter.get_stats(),
+            'extraction': YTDLSource.pool.get_stats()
+        }
+    
     @commands.hybrid_command(name="join")
     @app_commands.describe(channel="Voice channel to join")
     async def join_voice(self, ctx, channel: discord.VoiceChannel = None):
@@ -188,11 +720,7 @@ class Music(commands.Cog):
             await ctx.send("❌ I'm not connected to any voice channel!")
             return
         
-        player = self.get_player(ctx.guild.id)
-        player.queue.clear()
-        player.current = None
-        
-        await ctx.guild.voice_client.disconnect()
+        await self.destroy_player(ctx.guild.id, ctx.guild.voice_client)
         
         embed = discord.Embed(
             title="👋 Left Voice Channel",
@@ -220,39 +748,81 @@ class Music(commands.Cog):
         loading_msg = await ctx.send("🔍 Searching for music...")
         
         # Extract track info
-        track_info = await YTDLSource.from_url(query)
+        try:
+            track_info = await YTDLSource.from_url(query, guild_id=ctx.guild.id, requester_id=ctx.author.id)
+        except ExtractionCancelled:
+            await loading_msg.edit(content="❌ Search cancelled because you left the voice channel.")
+            return
         
         if not track_info:
             await loading_msg.edit(content="❌ Could not find or extract audio from the provided query.")
             return
         
-        # Add requester info
-        track_info['requester'] = ctx.author
-        track_info['requester_id'] = ctx.author.id
-        
         # Add to queue
-        player.add_to_queue(track_info)
+        track = Track.from_info(track_info, ctx.author)
+        player.add_to_queue(track)
         
         embed = discord.Embed(
             title="🎵 Added to Queue",
-            description=f"**[{track_info['title']}]({track_info['webpage_url']})**",
+            description=f"**[{track.title}]({track.webpage_url})**",
             color=discord.Color.blue()
         )
         embed.add_field(name="Requested by", value=ctx.author.mention, inline=True)
         embed.add_field(name="Position in queue", value=str(len(player.queue)), inline=True)
         
-        if track_info.get('duration'):
-            minutes, seconds = divmod(track_info['duration'], 60)
+        if track.duration:
+            minutes, seconds = divmod(track.duration, 60)
             embed.add_field(name="Duration", value=f"{minutes}:{seconds:02d}", inline=True)
         
-        if track_info.get('thumbnail'):
-            embed.set_thumbnail(url=track_info['thumbnail'])
+        if track.thumbnail:
+            embed.set_thumbnail(url=track.thumbnail)
         
         await loading_msg.edit(content="", embed=embed)
         
         # Start playing if nothing is currently playing
-        if not player.voice_client.is_playing():
-            await player.play_next()
+        player.start()
+    
+    @commands.hybrid_command(name="playlist")
+    @app_commands.describe(url="Playlist URL")
+    async def play_playlist(self, ctx, *, url: str):
+        """Queue every track of a playlist"""
+        if not ctx.author.voice:
+            await ctx.send("❌ You must be in a voice channel to play music!")
+            return
+        
+        if not ctx.guild.voice_client:
+            await ctx.author.voice.channel.connect()
+        
+        player = self.get_player(ctx.guild.id)
+        player.voice_client = ctx.guild.voice_client
+        
+        loading_msg = await ctx.send("🔍 Loading playlist...")
+        
+        try:
+            playlist = await YTDLSource.from_playlist(url, guild_id=ctx.guild.id, requester_id=ctx.author.id)
+        except ExtractionCancelled:
+            await loading_msg.edit(content="❌ Playlist load cancelled because you left the voice channel.")
+            return
+        
+        if not playlist or not playlist['tracks']:
+            await loading_msg.edit(content="❌ Could not load any tracks from that playlist.")
+            return
+        
+        tracks = playlist['tracks']
+        # One extraction fetched the whole listing, so queue it in one go
+        player.extend_queue([Track.from_info(info, ctx.author) for info in tracks])
+        player.start()
+        
+        embed = discord.Embed(
+            title="🎵 Playlist Queued",
+            description=f"**[{playlist['title']}]({playlist['webpage_url']})**",
+            color=discord.Color.blue()
+        )
+        embed.add_field(name="Tracks added", value=f"{len(tracks):,}", inline=True)
+        embed.add_field(name="Requested by", value=ctx.author.mention, inline=True)
+        embed.add_field(name="Queue length", value=f"{len(player.queue):,}", inline=True)
+        
+        await loading_msg.edit(content="", embed=embed)
     
     @commands.hybrid_command(name="pause")
     async def pause_music(self, ctx):
@@ -303,7 +873,8 @@ class Music(commands.Cog):
         await ctx.send(embed=embed)
     
     @commands.hybrid_command(name="queue")
-    async def show_queue(self, ctx):
+    @app_commands.describe(page="Queue page to show")
+    async def show_queue(self, ctx, page: int = 1):
         """Show the music queue"""
         player = self.get_player(ctx.guild.id)
         
@@ -320,15 +891,20 @@ class Music(commands.Cog):
         if player.current:
             embed.add_field(
                 name="Now Playing",
-                value=f"**[{player.current['title']}]({player.current['webpage_url']})**\nRequested by: {player.current.get('requester', 'Unknown')}",
+                value=f"**[{player.current.title}]({player.current.webpage_url})**\nRequested by: {player.current.requester_mention}",
                 inline=False
             )
         
         # Queue
         if player.queue:
+            per_page = 10
+            pages = (len(player.queue) + per_page - 1) // per_page
+            page = max(1, min(page, pages))
+            start = (page - 1) * per_page
+            
             queue_text = ""
-            for i, track in enumerate(list(player.queue)[:10]):  # Show first 10
-                queue_text += f"{i+1}. **[{track['title']}]({track['webpage_url']})**\n"
+            for i, track in enumerate(player.queue.slice(start, start + per_page), start=start):
+                queue_text += f"{i+1}. **[{track.title}]({track.webpage_url})**\n"
             
             embed.add_field(
                 name=f"Up Next ({len(player.queue)} songs)",
@@ -336,12 +912,8 @@ class Music(commands.Cog):
                 inline=False
             )
             
-            if len(player.queue) > 10:
-                embed.add_field(
-                    name="",
-                    value=f"... and {len(player.queue) - 10} more songs",
-                    inline=False
-                )
+            if pages > 1:
+                embed.set_footer(text=f"Page {page}/{pages}")
         
         await ctx.send(embed=embed)
     
@@ -354,14 +926,15 @@ class Music(commands.Cog):
             return
         
         player = self.get_player(ctx.guild.id)
-        player.volume = volume / 100.0
+        player.voice_client = ctx.guild.voice_client or player.voice_client
         
-        if ctx.guild.voice_client and ctx.guild.voice_client.source:
-            ctx.guild.voice_client.source.volume = player.volume
+        description = f"Volume set to {volume}%"
+        if not player.set_volume(volume / 100.0):
+            description += " (applies from the next song)"
         
         embed = discord.Embed(
             title="🔊 Volume Changed",
-            description=f"Volume set to {volume}%",
+            description=description,
             color=discord.Color.green()
         )
         await ctx.send(embed=embed)
@@ -377,19 +950,71 @@ class Music(commands.Cog):
         
         embed = discord.Embed(
             title="🎵 Now Playing",
-            description=f"**[{player.current['title']}]({player.current['webpage_url']})**",
+            description=f"**[{player.current.title}]({player.current.webpage_url})**",
             color=discord.Color.blue()
         )
-        embed.add_field(name="Requested by", value=player.current.get('requester', 'Unknown'), inline=True)
+        embed.add_field(name="Requested by", value=player.current.requester_mention, inline=True)
         embed.add_field(name="Volume", value=f"{int(player.volume * 100)}%", inline=True)
         embed.add_field(name="Loop", value="✅ Enabled" if player.loop else "❌ Disabled", inline=True)
         
-        if player.current.get('duration'):
-            minutes, seconds = divmod(player.current['duration'], 60)
+        if player.current.duration:
+            minutes, seconds = divmod(player.current.duration, 60)
             embed.add_field(name="Duration", value=f"{minutes}:{seconds:02d}", inline=True)
         
-        if player.current.get('thumbnail'):
-            embed.set_thumbnail(url=player.current['thumbnail'])
+        if player.current.thumbnail:
+            embed.set_thumbnail(url=player.current.thumbnail)
+        
+        await ctx.send(embed=embed)
+    
+    @commands.hybrid_command(name="musicstats")
+    async def music_stats(self, ctx):
+        """Show music subsystem statistics"""
+        stats = self.get_stats()
+        cache = stats['track_cache']
+        
+        embed = discord.Embed(
+            title="📈 Music Statistics",
+            color=discord.Color.blue()
+        )
+        embed.add_field(name="Players", value=f"{stats['players']:,}", inline=True)
+        voice = stats['voice']
+        embed.add_field(name="Voice Sessions", value=f"{voice['voice_sessions']:,} ({voice['playing_sessions']:,} playing)", inline=True)
+        embed.add_field(name="FFmpeg Processes", value=f"{voice['ffmpeg_processes']:,}", inline=True)
+        embed.add_field(
+            name="Track Cache",
+            value=f"{cache['size']:,}/{cache['max_size']:,} entries\n"
+                  f"Hit rate: {cache['hit_rate'] * 100:.1f}% ({cache['hits']:,} hits, {cache['misses']:,} misses)\n"
+                  f"Shared extractions: {cache['coalesced']:,}",
+            inline=False
+        )
+        
+        extraction = stats['extraction']
+        embed.add_field(
+            name="Extraction Pool",
+            value=f"{extraction['running']}/{extraction['workers']} workers busy, "
+                  f"{extraction['queue_depth']} queued\n"
+                  f"Avg wait: {extraction['avg_wait_ms']:.0f}ms, avg run: {extraction['avg_run_ms']:.0f}ms\n"
+                  f"Timeouts: {extraction['timeouts']:,}, cancelled: {extraction['cancelled']:,}",
+            inline=False
+        )
+        
+        for mode, playback in stats['playback'].items():
+            embed.add_field(
+                name=f"Playback ({mode})",
+                value=f"{playback['sessions']:,} songs, {playback['audio_seconds'] / 60:,.0f} min\n"
+                      f"CPU per stream: {playback['player_cpu_percent']:.1f}% bot + "
+                      f"{playback['ffmpeg_cpu_percent']:.1f}% FFmpeg",
+                inline=True
+            )
+        
+        audio = stats['audio_cache']
+        if audio['enabled']:
+            embed.add_field(
+                name="Audio Cache",
+                value=f"{audio['files']:,} files, {audio['bytes'] / 1048576:.0f}/{audio['max_bytes'] / 1048576:.0f} MB\n"
+                      f"Hit rate: {audio['hit_rate'] * 100:.1f}%, transcoding: {audio['transcoding']}",
+                inline=False
+            )
         
         await ctx.send(embed=embed)
     
@@ -405,6 +1030,60 @@ class Music(commands.Cog):
             color=discord.Color.red()
         )
         await ctx.send(embed=embed)
+    
+    @commands.hybrid_command(name="remove")
+    @app_commands.describe(position="Queue position to remove")
+    async def remove(self, ctx, position: int):
+        """Remove a song from the queue"""
+        player = self.get_player(ctx.guild.id)
+        track = player.remove_from_queue(position - 1)
+        
+        if not track:
+            await ctx.send(f"❌ There is no song at position {position}!")
+            return
+        
+        embed = discord.Embed(
+            title="🗑️ Removed from Queue",
+            description=f"**[{track.title}]({track.webpage_url})**",
+            color=discord.Color.red()
+        )
+        await ctx.send(embed=embed)
+    
+    @commands.hybrid_command(name="move")
+    @app_commands.describe(source="Current queue position", destination="New queue position")
+    async def move(self, ctx, source: int, destination: int):
+        """Move a song to another position in the queue"""
+        player = self.get_player(ctx.guild.id)
+        track = player.move_in_queue(source - 1, destination - 1)
+        
+        if not track:
+            await ctx.send(f"❌ There is no song at position {source}!")
+            return
+        
+        embed = discord.Embed(
+            title="↕️ Moved in Queue",
+            description=f"**[{track.title}]({track.webpage_url})** is now at position {max(1, min(destination, len(player.queue)))}",
+            color=discord.Color.blue()
+        )
+        await ctx.send(embed=embed)
+    
+    @commands.hybrid_command(name="shuffle")
+    async def shuffle(self, ctx):
+        """Shuffle the music queue"""
+        player = self.get_player(ctx.guild.id)
+        
+        if len(player.queue) < 2:
+            await ctx.send("❌ Not enough songs in the queue to shuffle!")
+            return
+        
+        player.shuffle_queue()
+        
+        embed = discord.Embed(
+            title="🔀 Queue Shuffled",
+            description=f"Shuffled {len(player.queue)} songs",
+            color=discord.Color.blue()
+        )
+        await ctx.send(embed=embed)
 
 async def setup(bot):
     await bot.add_cog(Music(bot))
@@ -3,9 +3,9 @@ from discord.ext import commands
 from discord import app_commands
 from datetime import datetime
 import platform
-import psutil
 from bot.database import db
 from utils.logger import setup_logger
+from utils.system_monitor import system_sampler
 
 logger = setup_logger(__name__)
 
@@ -231,17 +231,16 @@ class Utilities(commands.Cog):
         embed.add_field(name="Python Version", value=platform.python_version(), inline=True)
         embed.add_field(name="discord.py Version", value=discord.__version__, inline=True)
         
-        # Memory usage
-        memory = psutil.virtual_memory()
+        # Memory usage, from the background sampler
+        sample = system_sampler.latest()
         embed.add_field(
             name="Memory Usage",
-            value=f"{memory.percent}% ({memory.used // 1024 // 1024}MB / {memory.total // 1024 // 1024}MB)",
+            value=f"{sample['memory_percent']}% ({sample['memory_used']}MB / {sample['memory_total']}MB)",
             inline=True
         )
         
         # CPU usage
-        cpu_percent = psutil.cpu_percent()
-        embed.add_field(name="CPU Usage", value=f"{cpu_percent}%", inline=True)
+        embed.add_field(name="CPU Usage", value=f"{sample['cpu_percent']}%", inline=True)
         
         await ctx.send(embed=embed)
     
@@ -1,22 +1,448 @@
 import sqlite3
 import asyncio
+import atexit
+import functools
+import queue
 import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
 from datetime import datetime
+from bot.migrations import run_migrations
+from bot.retention import RetentionWorker
 from utils.logger import setup_logger
 from config import Config
 
 logger = setup_logger(__name__)
 
+class ConnectionPool:
+    """Bounded pool of reusable SQLite connections"""
+    
+    def __init__(self, db_path, size, timeout=None, name='pool', pragmas=None):
+        self.db_path = db_path
+        self.size = size
+        self.timeout = timeout if timeout is not None else Config.DATABASE_POOL_TIMEOUT
+        self.name = name
+        self.pragmas = pragmas or {}
+        self._idle = queue.LifoQueue(maxsize=size)
+        self._created = 0
+        self._create_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._closed = False
+        
+        # Pool statistics
+        self.checkouts = 0
+        self.waits = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.in_use = 0
+    
+    def _connect(self):
+        """Open a new connection with the pool's settings"""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.timeout,
+            check_same_thread=False,
+            cached_statements=Config.DATABASE_STATEMENT_CACHE
+        )
+        conn.row_factory = sqlite3.Row
+        for pragma, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {pragma} = {value}")
+        return conn
+    
+    def acquire(self):
+        """Check out a connection, opening one if the pool is not yet full"""
+        if self._closed:
+            raise RuntimeError(f"Connection pool '{self.name}' is closed")
+        
+        start = time.perf_counter()
+        waited = False
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = None
+            with self._create_lock:
+                if self._created < self.size:
+                    conn = self._connect()
+                    self._created += 1
+            
+            if conn is None:
+                waited = True
+                try:
+                    conn = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    raise TimeoutError(
+                        f"Timed out after {self.timeout}s waiting for a '{self.name}' connection"
+                    )
+        
+        wait = time.perf_counter() - start
+        with self._stats_lock:
+            self.checkouts += 1
+            self.in_use += 1
+            if waited:
+                self.waits += 1
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+        return conn
+    
+    def release(self, conn):
+        """Return a connection to the pool"""
+        with self._stats_lock:
+            self.in_use -= 1
+        
+        if self._closed:
+            conn.close()
+            return
+        self._idle.put_nowait(conn)
+    
+    @contextmanager
+    def connection(self):
+        """Context manager yielding a pooled connection"""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+    
+    def close(self):
+        """Close all idle connections; busy ones close on release"""
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+    
+    def get_stats(self):
+        """Get pool statistics"""
+        with self._stats_lock:
+            return {
+                'size': self.size,
+                'open': self._created,
+                'idle': self._idle.qsize(),
+                'in_use': self.in_use,
+                'checkouts': self.checkouts,
+                'waits': self.waits,
+                'total_wait_ms': round(self.total_wait * 1000, 2),
+                'avg_wait_ms': round(self.total_wait / self.waits * 1000, 2) if self.waits else 0.0,
+                'max_wait_ms': round(self.max_wait * 1000, 2)
+            }
+
+class WriteBuffer:
+    """Write-behind buffer that batches analytics inserts into one transaction"""
+    
+    INSERTS = {
+        'command_stats': '''
+            INSERT INTO command_stats (guild_id, user_id, command_name, used_at)
+            VALUES (?, ?, ?, ?)
+        ''',
+        'music_history': '''
+            INSERT INTO music_history (guild_id, user_id, title, url, duration, played_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        '''
+    }
+    
+    HOURLY_ROLLUP = '''
+        INSERT INTO command_stats_hourly (bucket, guild_id, command_name, usage_count)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT (bucket, guild_id, command_name)
+        DO UPDATE SET usage_count = usage_count + excluded.usage_count
+    '''
+    
+    DAILY_ROLLUP = '''
+        INSERT INTO command_stats_daily (day, guild_id, command_name, usage_count)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT (day, guild_id, command_name)
+        DO UPDATE SET usage_count = usage_count + excluded.usage_count
+    '''
+    
+    def __init__(self, writer_pool, max_rows, flush_interval):
+        self.writer_pool = writer_pool
+        self.max_rows = max_rows
+        self.flush_interval = flush_interval
+        # Rows kept when flushes keep failing before the oldest are dropped
+        self.max_pending = max_rows * 10
+        
+        self._rows = {table: [] for table in self.INSERTS}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        
+        # Bumped for a table whenever a flush commits rows to it, so readers
+        # can tell whether derived results are still current
+        self.versions = {table: 0 for table in self.INSERTS}
+        
+        # Buffer statistics
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.rows_flushed = 0
+        self.rows_dropped = 0
+        self.last_flush = 0.0
+        self.total_flush = 0.0
+        self.max_flush = 0.0
+    
+    def add(self, table, row):
+        """Queue a row for insertion"""
+        with self._lock:
+            self._rows[table].append(row)
+            depth = self._depth()
+        
+        if self._thread is None:
+            self.start()
+        if depth >= self.max_rows:
+            self._wakeup.set()
+    
+    def _depth(self):
+        return sum(len(rows) for rows in self._rows.values())
+    
+    def start(self):
+        """Start the background flusher thread"""
+        with self._lock:
+            if self._thread is not None or self._stopped.is_set():
+                return
+            self._thread = threading.Thread(
+                target=self._run, name='pulseforge-db-flusher', daemon=True
+            )
+        self._thread.start()
+    
+    def _run(self):
+        """Flush on whichever comes first: size threshold or flush interval"""
+        while not self._stopped.is_set():
+            self._wakeup.wait(timeout=self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Error flushing write buffer: {e}")
+    
+    def flush(self):
+        """Write all buffered rows in a single transaction"""
+        with self._flush_lock:
+            with self._lock:
+                pending = self._rows
+                self._rows = {table: [] for table in self.INSERTS}
+            
+            count = sum(len(rows) for rows in pending.values())
+            if not count:
+                return 0
+            
+            start = time.perf_counter()
+            try:
+                # Waiting for the writer can time out too; the rows go back either way
+                with self.writer_pool.connection() as conn:
+                    try:
+                        for table, rows in pending.items():
+                            if rows:
+                                conn.executemany(self.INSERTS[table], rows)
+                        if pending['command_stats']:
+                            self._update_rollups(conn, pending['command_stats'])
+                        conn.commit()
+                    except Exception:
+                        conn.rollback()
+                        raise
+            except Exception:
+                self._requeue(pending)
+                raise
+            elapsed = time.perf_counter() - start
+            
+            with self._lock:
+                for table, rows in pending.items():
+                    if rows:
+                        self.versions[table] += 1
+                self.flushes += 1
+                self.rows_flushed += count
+                self.last_flush = elapsed
+                self.total_flush += elapsed
+                self.max_flush = max(self.max_flush, elapsed)
+            
+            logger.debug(f"Flushed {count} buffered rows in {elapsed * 1000:.1f}ms")
+            return count
+    
+    def _update_rollups(self, conn, rows):
+        """Fold command_stats rows into the hourly and daily rollups"""
+        hourly = Counter()
+        daily = Counter()
+        for guild_id, user_id, command_name, used_at in rows:
+            guild_id = guild_id or 0
+            hourly[(used_at[:13] + ':00:00', guild_id, command_name)] += 1
+            daily[(used_at[:10], guild_id, command_name)] += 1
+        
+        conn.executemany(self.HOURLY_ROLLUP, [key + (count,) for key, count in hourly.items()])
+        conn.executemany(self.DAILY_ROLLUP, [key + (count,) for key, count in daily.items()])
+    
+    def _requeue(self, pending):
+        """Put rows from a failed flush back in front of newer rows"""
+        with self._lock:
+            self.failed_flushes += 1
+            for table, rows in pending.items():
+                merged = rows + self._rows[table]
+                overflow = len(merged) - self.max_pending
+                if overflow > 0:
+                    merged = merged[overflow:]
+                    self.rows_dropped += overflow
+                    logger.warning(f"Write buffer full, dropped {overflow} {table} rows")
+                self._rows[table] = merged
+    
+    def stop(self):
+        """Stop the flusher thread and flush whatever is left"""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"Final write buffer flush failed: {e}")
+    
+    def get_stats(self):
+        """Get buffer depth and flush latency statistics"""
+        with self._lock:
+            return {
+                'depth': self._depth(),
+                'depth_by_table': {table: len(rows) for table, rows in self._rows.items()},
+                'max_rows': self.max_rows,
+                'flush_interval': self.flush_interval,
+                'flushes': self.flushes,
+                'failed_flushes': self.failed_flushes,
+                'rows_flushed': self.rows_flushed,
+                'rows_dropped': self.rows_dropped,
+                'versions': dict(self.versions),
+                'last_flush_ms': round(self.last_flush * 1000, 2),
+                'avg_flush_ms': round(self.total_flush / self.flushes * 1000, 2) if self.flushes else 0.0,
+                'max_flush_ms': round(self.max_flush * 1000, 2)
+            }
+
+class SettingsCache:
+    """Bounded LRU cache of server settings rows"""
+    
+    MISSING = object()
+    
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped on every invalidation so a read that raced a write
+        # cannot put a stale row back into the cache
+        self.generation = 0
+        
+        # Cache statistics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, guild_id):
+        """Return the cached row (None if the guild has none) or MISSING"""
+        with self._lock:
+            if guild_id not in self._entries:
+                self.misses += 1
+                return self.MISSING
+            self._entries.move_to_end(guild_id)
+            self.hits += 1
+            value = self._entries[guild_id]
+        return dict(value) if value is not None else None
+    
+    def put(self, guild_id, value, generation):
+        """Cache a row read while the cache was at the given generation"""
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[guild_id] = dict(value) if value is not None else None
+            self._entries.move_to_end(guild_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def invalidate(self, guild_id):
+        """Drop a guild's cached row"""
+        with self._lock:
+            self.generation += 1
+            self._entries.pop(guild_id, None)
+    
+    def clear(self):
+        """Drop every cached row"""
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+    
+    def get_stats(self):
+        """Get cache statistics"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
 class Database:
+    SYNCHRONOUS_MODES = ('OFF', 'NORMAL', 'FULL', 'EXTRA')
+    
     def __init__(self):
         self.db_path = Config.DATABASE_PATH
-        self.lock = threading.Lock()
+        self.journal_mode = self.set_journal_mode(Config.DATABASE_JOURNAL_MODE)
+        
+        synchronous = Config.DATABASE_SYNCHRONOUS.upper()
+        if synchronous not in self.SYNCHRONOUS_MODES:
+            logger.warning(f"Invalid DATABASE_SYNCHRONOUS '{synchronous}', using NORMAL")
+            synchronous = 'NORMAL'
+        
+        pragmas = {
+            'synchronous': synchronous,
+            'cache_size': Config.DATABASE_CACHE_SIZE,
+            'mmap_size': Config.DATABASE_MMAP_SIZE
+        }
+        
+        # Readers share a bounded pool; all writes go through a single
+        # connection so SQLite never sees competing writers from this process.
+        # In WAL mode readers and the writer never block each other.
+        self.reader_pool = ConnectionPool(
+            self.db_path, Config.DATABASE_POOL_SIZE, name='reader',
+            pragmas=dict(pragmas, query_only='ON')
+        )
+        self.writer_pool = ConnectionPool(self.db_path, 1, name='writer', pragmas=pragmas)
+        
+        # Executors backing the async API: reads fan out across the reader
+        # pool, writes are serialized on one dedicated thread
+        self.read_executor = ThreadPoolExecutor(
+            max_workers=Config.DATABASE_POOL_SIZE, thread_name_prefix='pulseforge-db-read'
+        )
+        self.write_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix='pulseforge-db-write'
+        )
+        
+        # Analytics rows (command_stats, music_history) are written behind
+        self.write_buffer = WriteBuffer(
+            self.writer_pool,
+            Config.DATABASE_BUFFER_MAX_ROWS,
+            Config.DATABASE_BUFFER_FLUSH_INTERVAL
+        )
+        self.settings_cache = SettingsCache(Config.SETTINGS_CACHE_SIZE)
+        self.retention = RetentionWorker(self.writer_pool)
         self.init_database()
     
+    def set_journal_mode(self, mode):
+        """Set the persistent journal mode and return the mode SQLite reports"""
+        conn = sqlite3.connect(self.db_path, timeout=Config.DATABASE_POOL_TIMEOUT)
+        try:
+            result = conn.execute(f"PRAGMA journal_mode = {mode}").fetchone()[0]
+        finally:
+            conn.close()
+        
+        if result.upper() != mode.upper():
+            logger.warning(f"Requested journal mode {mode} but database is using {result}")
+        else:
+            logger.info(f"Database journal mode: {result}")
+        return result
+    
     def init_database(self):
         """Initialize database tables"""
-        with self.lock:
-            conn = sqlite3.connect(self.db_path)
+        with self.writer_pool.connection() as conn:
             cursor = conn.cursor()
             
             # Server settings table
@@ -70,14 +496,17 @@ class Database:
             ''')
             
             conn.commit()
-            conn.close()
+            
+            # Indexes and later schema changes
+            self.schema_version = run_migrations(conn)
             logger.info("Database initialized successfully")
     
     def execute_query(self, query, params=None):
         """Execute a query and return results"""
-        with self.lock:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
+        is_select = query.strip().upper().startswith('SELECT')
+        pool = self.reader_pool if is_select else self.writer_pool
+        
+        with pool.connection() as conn:
             cursor = conn.cursor()
             
             try:
@@ -86,7 +515,7 @@ class Database:
                 else:
                     cursor.execute(query)
                 
-                if query.strip().upper().startswith('SELECT'):
+                if is_select:
                     results = cursor.fetchall()
                     return [dict(row) for row in results]
                 else:
@@ -97,26 +526,54 @@ class Database:
                 conn.rollback()
                 raise
             finally:
-                conn.close()
+                cursor.close()
+    
+    def get_pool_stats(self):
+        """Get connection pool statistics"""
+        return {
+            'reader': self.reader_pool.get_stats(),
+            'writer': self.writer_pool.get_stats()
+        }
+    
+    def close(self):
+        """Finish pending async work and close all pooled connections"""
+        self.retention.stop()
+        self.read_executor.shutdown(wait=True)
+        self.write_executor.shutdown(wait=True)
+        self.write_buffer.stop()
+        self.reader_pool.close()
+        self.writer_pool.close()
+        logger.info("Database connections closed")
     
     def get_server_settings(self, guild_id):
         """Get server settings"""
+        cached = self.settings_cache.get(guild_id)
+        if cached is not SettingsCache.MISSING:
+            return cached
+        
+        generation = self.settings_cache.generation
         query = "SELECT * FROM server_settings WHERE guild_id = ?"
         results = self.execute_query(query, (guild_id,))
-        return results[0] if results else None
+        settings = results[0] if results else None
+        self.settings_cache.put(guild_id, settings, generation)
+        return settings
     
     def update_server_settings(self, guild_id, **settings):
         """Update server settings"""
-        if not self.get_server_settings(guild_id):
-            # Insert new record
-            query = "INSERT INTO server_settings (guild_id) VALUES (?)"
-            self.execute_query(query, (guild_id,))
-        
-        # Update settings
-        set_clause = ", ".join([f"{key} = ?" for key in settings.keys()])
-        query = f"UPDATE server_settings SET {set_clause} WHERE guild_id = ?"
-        params = list(settings.values()) + [guild_id]
-        self.execute_query(query, params)
+        try:
+            if not self.get_server_settings(guild_id):
+                # Insert new record
+                query = "INSERT OR IGNORE INTO server_settings (guild_id) VALUES (?)"
+                self.execute_query(query, (guild_id,))
+            
+            # Update settings
+            if settings:
+                set_clause = ", ".join([f"{key} = ?" for key in settings.keys()])
+                query = f"UPDATE server_settings SET {set_clause} WHERE guild_id = ?"
+                params = list(settings.values()) + [guild_id]
+                self.execute_query(query, params)
+        finally:
+            self.settings_cache.invalidate(guild_id)
     
     def add_warning(self, guild_id, user_id, moderator_id, reason):
         """Add a warning to the database"""
@@ -135,42 +592,115 @@ class Database:
             query = "SELECT * FROM warnings WHERE guild_id = ? ORDER BY created_at DESC LIMIT 50"
             return self.execute_query(query, (guild_id,))
     
+    @staticmethod
+    def _timestamp():
+        """Current UTC time in SQLite's CURRENT_TIMESTAMP format"""
+        return datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+    
     def log_command_usage(self, guild_id, user_id, command_name):
-        """Log command usage for statistics"""
-        query = '''
-            INSERT INTO command_stats (guild_id, user_id, command_name)
-            VALUES (?, ?, ?)
-        '''
-        self.execute_query(query, (guild_id, user_id, command_name))
+        """Log command usage for statistics (buffered)"""
+        self.write_buffer.add(
+            'command_stats', (guild_id, user_id, command_name, self._timestamp())
+        )
     
     def get_command_stats(self, guild_id=None, days=7):
-        """Get command usage statistics"""
-        if guild_id:
-            query = '''
-                SELECT command_name, COUNT(*) as usage_count
-                FROM command_stats
-                WHERE guild_id = ? AND used_at >= datetime('now', '-{} days')
-                GROUP BY command_name
-                ORDER BY usage_count DESC
-            '''.format(days)
-            return self.execute_query(query, (guild_id,))
+        """Get command usage statistics from the hourly or daily rollups"""
+        if days <= Config.ROLLUP_HOURLY_DAYS:
+            table, column = 'command_stats_hourly', 'bucket'
+            since = "strftime('%Y-%m-%d %H:00:00', 'now', ?)"
         else:
-            query = '''
-                SELECT command_name, COUNT(*) as usage_count
-                FROM command_stats
-                WHERE used_at >= datetime('now', '-{} days')
-                GROUP BY command_name
-                ORDER BY usage_count DESC
-            '''.format(days)
-            return self.execute_query(query)
+            # Whole days, so the window also includes the rest of the oldest day
+            table, column = 'command_stats_daily', 'day'
+            since = "date('now', ?)"
+        
+        params = [f'-{int(days)} days']
+        guild_filter = ''
+        if guild_id:
+            guild_filter = 'AND guild_id = ?'
+            params.append(guild_id)
+        
+        query = f'''
+            SELECT command_name, SUM(usage_count) as usage_count
+            FROM {table}
+            WHERE {column} >= {since} {guild_filter}
+            GROUP BY command_name
+            ORDER BY usage_count DESC
+        '''
+        return self.execute_query(query, params)
     
     def add_music_history(self, guild_id, user_id, title, url, duration=0):
-        """Add music play history"""
+        """Add music play history (buffered)"""
+        self.write_buffer.add(
+            'music_history', (guild_id, user_id, title, url, duration, self._timestamp())
+        )
+    
+    def _execute_many(self, statements):
+        """Run (query, params_seq) pairs on the writer in one transaction"""
+        with self.writer_pool.connection() as conn:
+            try:
+                for query, params_seq in statements:
+                    conn.executemany(query, params_seq)
+                conn.commit()
+            except Exception as e:
+                logger.error(f"Database error: {e}")
+                conn.rollback()
+                raise
+    
+    def save_queue_items(self, guild_id, items):
+        """Insert or replace queued tracks as (item_id, position, title, webpage_url,
+        duration, thumbnail, requester_id, requester_name) tuples"""
         query = '''
-            INSERT INTO music_history (guild_id, user_id, title, url, duration)
-            VALUES (?, ?, ?, ?, ?)
+            INSERT OR REPLACE INTO music_queue_items
+            (guild_id, item_id, position, title, webpage_url, duration, thumbnail, requester_id, requester_name)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
         '''
-        self.execute_query(query, (guild_id, user_id, title, url, duration))
+        self._execute_many([(query, [(guild_id,) + tuple(item) for item in items])])
+    
+    def delete_queue_items(self, guild_id, item_ids):
+        """Delete queued tracks by item id"""
+        query = "DELETE FROM music_queue_items WHERE guild_id = ? AND item_id = ?"
+        self._execute_many([(query, [(guild_id, item_id) for item_id in item_ids])])
+    
+    def update_queue_positions(self, guild_id, positions):
+        """Move queued tracks, given (item_id, position) pairs"""
+        query = "UPDATE music_queue_items SET position = ? WHERE guild_id = ? AND item_id = ?"
+        self._execute_many([(query, [(position, guild_id, item_id) for item_id, position in positions])])
+    
+    def save_player_state(self, guild_id, volume, current_item_id=None, finished_item_id=None):
+        """Record the player's volume and playing track, dropping the finished one"""
+        statements = [('''
+            INSERT INTO music_player_state (guild_id, volume, current_item_id, updated_at)
+            VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT (guild_id) DO UPDATE SET
+                volume = excluded.volume,
+                current_item_id = excluded.current_item_id,
+                updated_at = excluded.updated_at
+        ''', [(guild_id, volume, current_item_id)])]
+        if finished_item_id is not None and finished_item_id != current_item_id:
+            statements.append((
+                "DELETE FROM music_queue_items WHERE guild_id = ? AND item_id = ?",
+                [(guild_id, finished_item_id)]
+            ))
+        self._execute_many(statements)
+    
+    def clear_saved_queue(self, guild_id):
+        """Forget a guild's saved queue and player state"""
+        self._execute_many([
+            ("DELETE FROM music_queue_items WHERE guild_id = ?", [(guild_id,)]),
+            ("DELETE FROM music_player_state WHERE guild_id = ?", [(guild_id,)])
+        ])
+    
+    def load_saved_queue(self, guild_id):
+        """Get a guild's saved player state (or None) and queued tracks in order"""
+        with self.writer_pool.connection() as conn:
+            state = conn.execute(
+                "SELECT * FROM music_player_state WHERE guild_id = ?", (guild_id,)
+            ).fetchone()
+            items = conn.execute(
+                "SELECT * FROM music_queue_items WHERE guild_id = ? ORDER BY position",
+                (guild_id,)
+            ).fetchall()
+        return (dict(state) if state else None), [dict(item) for item in items]
     
     def get_music_history(self, guild_id, limit=20):
         """Get music play history"""
@@ -182,5 +712,84 @@ class Database:
         '''
         return self.execute_query(query, (guild_id, limit))
 
+    # Async API - runs the synchronous methods off the event loop
+    
+    async def _run_read(self, func, *args, **kwargs):
+        """Run a read on the reader executor"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.read_executor, functools.partial(func, *args, **kwargs))
+    
+    async def _run_write(self, func, *args, **kwargs):
+        """Run a write on the single writer thread"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.write_executor, functools.partial(func, *args, **kwargs))
+    
+    async def aexecute_query(self, query, params=None):
+        """Async version of execute_query"""
+        if query.strip().upper().startswith('SELECT'):
+            return await self._run_read(self.execute_query, query, params)
+        return await self._run_write(self.execute_query, query, params)
+    
+    async def aget_server_settings(self, guild_id):
+        """Async version of get_server_settings; cache hits never leave the loop"""
+        cached = self.settings_cache.get(guild_id)
+        if cached is not SettingsCache.MISSING:
+            return cached
+        return await self._run_read(self.get_server_settings, guild_id)
+    
+    async def aupdate_server_settings(self, guild_id, **settings):
+        """Async version of update_server_settings"""
+        return await self._run_write(self.update_server_settings, guild_id, **settings)
+    
+    async def aadd_warning(self, guild_id, user_id, moderator_id, reason):
+        """Async version of add_warning"""
+        return await self._run_write(self.add_warning, guild_id, user_id, moderator_id, reason)
+    
+    async def aget_warnings(self, guild_id, user_id=None):
+        """Async version of get_warnings"""
+        return await self._run_read(self.get_warnings, guild_id, user_id)
+    
+    async def alog_command_usage(self, guild_id, user_id, command_name):
+        """Async version of log_command_usage; buffering makes it non-blocking"""
+        self.log_command_usage(guild_id, user_id, command_name)
+    
+    async def aget_command_stats(self, guild_id=None, days=7):
+        """Async version of get_command_stats"""
+        return await self._run_read(self.get_command_stats, guild_id, days)
+    
+    async def aadd_music_history(self, guild_id, user_id, title, url, duration=0):
+        """Async version of add_music_history; buffering makes it non-blocking"""
+        self.add_music_history(guild_id, user_id, title, url, duration)
+    
+    async def aget_music_history(self, guild_id, limit=20):
+        """Async version of get_music_history"""
+        return await self._run_read(self.get_music_history, guild_id, limit)
+    
+    def defer_write(self, func, *args, **kwargs):
+        """Queue a write on the writer thread without waiting for it
+        
+        Deferred writes run in submission order, after any earlier writes.
+        """
+        future = self.write_executor.submit(func, *args, **kwargs)
+        future.add_done_callback(self._log_deferred_error)
+        return future
+    
+    @staticmethod
+    def _log_deferred_error(future):
+        if not future.cancelled() and future.exception() is not None:
+            logger.error(f"Deferred write failed: {future.exception()}")
+    
+    async def aload_saved_queue(self, guild_id):
+        """Async version of load_saved_queue
+        
+        Runs on the writer thread so it sees every deferred queue write.
+        """
+        return await self._run_write(self.load_saved_queue, guild_id)
+    
+    async def aflush(self):
+        """Flush the write buffer without blocking the event loop"""
+        return await self._run_write(self.write_buffer.flush)
+
 # Global database instance
 db = Database()
+atexit.register(db.close)
@@ -0,0 +1,113 @@
+"""
+In-process bus carrying bot activity to the web dashboard
+"""
+import threading
+from collections import Counter, deque
+from datetime import datetime
+from config import Config
+
+# Discord ids in events; sent as strings because they exceed 2**53, the
+# largest integer JavaScript numbers hold exactly
+ID_FIELDS = ('guild_id', 'user_id')
+
+def snowflake(value):
+    """A Discord id as a JSON-safe string (None stays None)"""
+    return None if value is None else str(value)
+
+class ActivityBatch:
+    """Events and counters collected for one scope between drains"""
+
+    __slots__ = ('events', 'commands', 'total')
+
+    def __init__(self, max_events):
+        self.events = deque(maxlen=max_events)
+        self.commands = Counter()
+        self.total = 0
+
+    def add(self, event):
+        self.events.append(event)
+        self.total += 1
+        if event['type'] == 'command':
+            self.commands[event.get('command')] += 1
+
+    def payload(self, guild_id=None):
+        """JSON-ready batch, newest events first like the recent activity list"""
+        events = list(self.events)
+        events.reverse()
+        command_count = sum(self.commands.values())
+        return {
+            'guild_id': snowflake(guild_id),
+            'activities': events,
+            'omitted': self.total - len(events),
+            'deltas': {
+                'commands_today': command_count,
+                'total_commands': command_count,
+                'commands': dict(self.commands)
+            }
+        }
+
+class ActivityBus:
+    """Collects activity events between dashboard pushes
+
+    Publishing is a short append under a lock, safe from the bot's event
+    loop. The consumer drains everything collected since its last drain as
+    one batch: the most recent events plus exact counter deltas, so a burst
+    of commands costs one message per batch however large it is. Each batch
+    is also split by guild, so a guild's viewers get only that guild's part.
+    """
+
+    def __init__(self, max_events):
+        self.max_events = max_events
+        self._lock = threading.Lock()
+        self._pending = ActivityBatch(max_events)
+        self._guilds = {}
+
+        # Bus statistics
+        self.published = 0
+        self.batches = 0
+
+    def publish(self, event_type, **fields):
+        """Record an activity event, e.g. publish('command', command='play', ...)"""
+        event = {'type': event_type, 'timestamp': datetime.utcnow().isoformat()}
+        event.update(fields)
+        for field in ID_FIELDS:
+            if field in event:
+                event[field] = snowflake(event[field])
+        guild_id = fields.get('guild_id')
+        with self._lock:
+            self._pending.add(event)
+            if guild_id is not None:
+                batch = self._guilds.get(guild_id)
+                if batch is None:
+                    batch = self._guilds[guild_id] = ActivityBatch(self.max_events)
+                batch.add(event)
+            self.published += 1
+
+    def drain(self):
+        """Take the pending batches, or None if nothing happened
+
+        Returns (all_guilds, {guild_id: guild_batch}) as ActivityBatch
+        objects; call payload() only on the ones someone is watching.
+        """
+        with self._lock:
+            if not self._pending.total:
+                return None
+            pending, guilds = self._pending, self._guilds
+            self._pending = ActivityBatch(self.max_events)
+            self._guilds = {}
+            self.batches += 1
+
+        return pending, guilds
+
+    def get_stats(self):
+        """Get bus statistics"""
+        with self._lock:
+            return {
+                'published': self.published,
+                'batches': self.batches,
+                'pending': self._pending.total,
+                'pending_guilds': len(self._guilds)
+            }
+
+# Global bus from the bot to the dashboard
+activity_bus = ActivityBus(Config.ACTIVITY_BATCH_MAX_EVENTS)
@@ -0,0 +1,202 @@
+"""
+Dedicated yt-dlp extraction pool with per-guild fair scheduling
+"""
+import asyncio
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+import yt_dlp
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+class ExtractionCancelled(Exception):
+    """Raised to callers whose queued extraction was cancelled"""
+
+class ExtractionQueueFull(Exception):
+    """Raised when the extraction queue is at capacity"""
+
+class ExtractionJob:
+    """A queued extraction request"""
+
+    __slots__ = ('guild_id', 'requester_id', 'url', 'options', 'future', 'submitted_at')
+
+    def __init__(self, guild_id, requester_id, url, options, future):
+        self.guild_id = guild_id
+        self.requester_id = requester_id
+        self.url = url
+        self.options = options
+        self.future = future
+        self.submitted_at = time.perf_counter()
+
+class ExtractionPool:
+    """Bounded pool of yt-dlp workers
+
+    Jobs queue per guild and are dispatched round-robin across guilds, so
+    one guild queueing a burst of requests cannot starve the others. Each
+    worker thread owns its own YoutubeDL instances, which are not safe to
+    share between threads. All scheduling happens on the event loop.
+    """
+
+    def __init__(self, ytdl_options, workers, timeout, max_queue):
+        self.ytdl_options = ytdl_options
+        self.workers = workers
+        self.timeout = timeout
+        self.max_queue = max_queue
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='pulseforge-ytdl')
+        self._local = threading.local()
+        # guild_id -> deque of jobs; iteration order is the round-robin order
+        self._queues = OrderedDict()
+        self._depth = 0
+        self._running = 0
+
+        # Pool statistics
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.total_run = 0.0
+        self.max_depth = 0
+
+    def _ytdl(self, options):
+        """Get this worker thread's YoutubeDL for an options override set"""
+        instances = getattr(self._local, 'instances', None)
+        if instances is None:
+            instances = self._local.instances = {}
+
+        key = tuple(sorted(options.items())) if options else ()
+        ytdl = instances.get(key)
+        if ytdl is None:
+            ytdl = instances[key] = yt_dlp.YoutubeDL(dict(self.ytdl_options, **(options or {})))
+        return ytdl
+
+    def _extract(self, url, options):
+        return self._ytdl(options).extract_info(url, download=False)
+
+    async def extract(self, url, guild_id=None, requester_id=None, options=None):
+        """Queue an extraction and wait for its result
+
+        Raises asyncio.TimeoutError if the job does not finish within the
+        pool timeout (measured from submission), ExtractionCancelled if it
+        was cancelled and ExtractionQueueFull if the queue is at capacity.
+        """
+        if self._depth >= self.max_queue:
+            self.rejected += 1
+            raise ExtractionQueueFull(f"Extraction queue is full ({self.max_queue} jobs)")
+
+        loop = asyncio.get_running_loop()
+        job = ExtractionJob(guild_id, requester_id, url, options, loop.create_future())
+        self._queues.setdefault(guild_id, deque()).append(job)
+        self._depth += 1
+        self.submitted += 1
+        self.max_depth = max(self.max_depth, self._depth)
+        self._dispatch()
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(job.future), self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            self._abandon(job, asyncio.TimeoutError())
+            raise
+        except asyncio.CancelledError:
+            self._abandon(job, ExtractionCancelled("Caller was cancelled"))
+            raise
+
+    def _abandon(self, job, exc):
+        """Resolve a job nobody is waiting on; queued jobs are then skipped"""
+        if not job.future.done():
+            job.future.set_exception(exc)
+            job.future.exception()
+
+    def _dispatch(self):
+        """Start queued jobs while workers are free"""
+        loop = asyncio.get_running_loop()
+        while self._running < self.workers and self._queues:
+            guild_id, jobs = next(iter(self._queues.items()))
+            job = jobs.popleft()
+            self._depth -= 1
+            if jobs:
+                self._queues.move_to_end(guild_id)
+            else:
+                del self._queues[guild_id]
+
+            if job.future.done():
+                continue
+
+            started = time.perf_counter()
+            self.total_wait += started - job.submitted_at
+            self._running += 1
+            work = loop.run_in_executor(self.executor, self._extract, job.url, job.options)
+            work.add_done_callback(lambda f, job=job, started=started: self._finished(job, f, started))
+
+    def _finished(self, job, work, started):
+        self._running -= 1
+        self.total_run += time.perf_counter() - started
+
+        if work.exception() is not None:
+            self.failed += 1
+            if not job.future.done():
+                job.future.set_exception(work.exception())
+        else:
+            self.completed += 1
+            if not job.future.done():
+                job.future.set_result(work.result())
+        self._dispatch()
+
+    def cancel(self, guild_id, requester_id=None):
+        """Cancel queued jobs for a guild, optionally only one requester's
+
+        Jobs already running cannot be interrupted; their results are
+        discarded.
+        """
+        jobs = self._queues.get(guild_id)
+        if not jobs:
+            return 0
+
+        kept = deque()
+        count = 0
+        for job in jobs:
+            if requester_id is None or job.requester_id == requester_id:
+                if not job.future.done():
+                    job.future.set_exception(ExtractionCancelled("Extraction was cancelled"))
+                    count += 1
+            else:
+                kept.append(job)
+
+        self._depth -= len(jobs) - len(kept)
+        if kept:
+            self._queues[guild_id] = kept
+        else:
+            del self._queues[guild_id]
+        self.cancelled += count
+        if count:
+            logger.info(f"Cancelled {count} queued extractions in guild {guild_id}")
+        return count
+
+    def shutdown(self):
+        """Stop the worker threads"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_stats(self):
+        """Get queue depth, latency and outcome statistics"""
+        started = self.completed + self.failed + self._running
+        finished = self.completed + self.failed
+        return {
+            'workers': self.workers,
+            'running': self._running,
+            'queue_depth': self._depth,
+            'max_queue_depth': self.max_depth,
+            'queued_guilds': len(self._queues),
+            'submitted': self.submitted,
+            'completed': self.completed,
+            'failed': self.failed,
+            'cancelled': self.cancelled,
+            'timeouts': self.timeouts,
+            'rejected': self.rejected,
+            'avg_wait_ms': round(self.total_wait / started * 1000, 2) if started else 0.0,
+            'avg_run_ms': round(self.total_run / finished * 1000, 2) if finished else 0.0
+        }
@@ -0,0 +1,103 @@
+"""
+Immutable snapshots of live bot state for the web dashboard
+"""
+import calendar
+import time
+from collections import namedtuple
+from types import MappingProxyType
+
+GuildSnapshot = namedtuple('GuildSnapshot', ['id', 'name', 'member_count', 'icon_url', 'voice_connected'])
+
+class LiveState(namedtuple('LiveState', [
+    'online', 'published_at', 'started_at', 'guilds', 'member_count', 'latency_ms',
+    'voice_sessions', 'playing_sessions', 'commands_used', 'rate_limits'
+])):
+    """What the bot knows in memory, frozen at publish time
+
+    guilds maps guild id to GuildSnapshot through a read-only proxy;
+    rate_limits holds the rate limit engine statistics the same way.
+    """
+
+    __slots__ = ()
+
+    @property
+    def guild_count(self):
+        return len(self.guilds)
+
+    @property
+    def uptime_seconds(self):
+        if not self.online or self.started_at is None:
+            return 0
+        return int(time.time() - self.started_at)
+
+    @property
+    def uptime(self):
+        """Uptime in the bot's 'Xh Ym Zs' format"""
+        hours, remainder = divmod(self.uptime_seconds, 3600)
+        minutes, seconds = divmod(remainder, 60)
+        return f"{hours}h {minutes}m {seconds}s"
+
+    def summary(self):
+        """JSON-ready headline numbers"""
+        return {
+            'status': 'online' if self.online else 'offline',
+            'servers': self.guild_count,
+            'users': self.member_count,
+            'latency': self.latency_ms,
+            'uptime': self.uptime,
+            'uptime_seconds': self.uptime_seconds,
+            'voice_sessions': self.voice_sessions,
+            'playing_sessions': self.playing_sessions,
+            'published_at': self.published_at
+        }
+
+OFFLINE = LiveState(
+    online=False, published_at=None, started_at=None, guilds=MappingProxyType({}),
+    member_count=0, latency_ms=None, voice_sessions=0, playing_sessions=0, commands_used=0,
+    rate_limits=MappingProxyType({})
+)
+
+# The published snapshot. Publishing rebinds this name and readers take
+# whatever it points at, so neither side ever locks.
+_current = OFFLINE
+
+def current():
+    """Latest published snapshot"""
+    return _current
+
+def publish(state):
+    """Replace the published snapshot"""
+    global _current
+    _current = state
+
+def snapshot_bot(bot):
+    """Build a snapshot from a running PulseForgeBot (call on its event loop)"""
+    voice_guilds = {voice_client.guild.id for voice_client in bot.voice_clients}
+    guilds = {
+        guild.id: GuildSnapshot(
+            guild.id,
+            guild.name,
+            guild.member_count or 0,
+            guild.icon.url if guild.icon else None,
+            guild.id in voice_guilds
+        )
+        for guild in bot.guilds
+    }
+    playing = sum(
+        1 for voice_client in bot.voice_clients
+        if voice_client.is_playing() or voice_client.is_paused()
+    )
+    latency = bot.latency
+    return LiveState(
+        online=bot.is_ready() and not bot.is_closed(),
+        published_at=time.time(),
+        # start_time is naive UTC
+        started_at=calendar.timegm(bot.start_time.utctimetuple()) if bot.start_time else None,
+        guilds=MappingProxyType(guilds),
+        member_count=sum(guild.member_count for guild in guilds.values()),
+        latency_ms=round(latency * 1000, 2) if latency == latency else None,  # NaN before connecting
+        voice_sessions=len(voice_guilds),
+        playing_sessions=playing,
+        commands_used=bot.commands_used,
+        rate_limits=MappingProxyType(bot.rate_limiter.get_stats())
+    )
@@ -0,0 +1,151 @@
+"""
+Versioned schema migrations for the PulseForge database
+"""
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Ordered list of (version, description, statements[, transactional]). The
+# applied version is stored in SQLite's PRAGMA user_version, so each migration
+# runs exactly once per database file. Never edit a released migration -
+# append a new one. Migrations that must run outside a transaction (VACUUM,
+# auto_vacuum changes) set transactional to False.
+MIGRATIONS = [
+    (1, "Add indexes for guild, user and time filtered queries", [
+        '''
+            CREATE INDEX IF NOT EXISTS idx_command_stats_guild_used
+            ON command_stats (guild_id, used_at)
+        ''',
+        '''
+            CREATE INDEX IF NOT EXISTS idx_command_stats_used
+            ON command_stats (used_at)
+        ''',
+        '''
+            CREATE INDEX IF NOT EXISTS idx_warnings_guild_user_created
+            ON warnings (guild_id, user_id, created_at)
+        ''',
+        '''
+            CREATE INDEX IF NOT EXISTS idx_warnings_guild_created
+            ON warnings (guild_id, created_at)
+        ''',
+        '''
+            CREATE INDEX IF NOT EXISTS idx_music_history_guild_played
+            ON music_history (guild_id, played_at)
+        '''
+    ]),
+    (2, "Add hourly and daily command usage rollups", [
+        '''
+            CREATE TABLE IF NOT EXISTS command_stats_hourly (
+                bucket TEXT NOT NULL,
+                guild_id INTEGER NOT NULL,
+                command_name TEXT NOT NULL,
+                usage_count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (bucket, guild_id, command_name)
+            )
+        ''',
+        '''
+            CREATE INDEX IF NOT EXISTS idx_command_stats_hourly_guild
+            ON command_stats_hourly (guild_id, bucket)
+        ''',
+        '''
+            CREATE TABLE IF NOT EXISTS command_stats_daily (
+                day TEXT NOT NULL,
+                guild_id INTEGER NOT NULL,
+                command_name TEXT NOT NULL,
+                usage_count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (day, guild_id, command_name)
+            )
+        ''',
+        '''
+            CREATE INDEX IF NOT EXISTS idx_command_stats_daily_guild
+            ON command_stats_daily (guild_id, day)
+        ''',
+        # Backfill from the raw log
+        '''
+            INSERT OR REPLACE INTO command_stats_hourly (bucket, guild_id, command_name, usage_count)
+            SELECT strftime('%Y-%m-%d %H:00:00', used_at), COALESCE(guild_id, 0), command_name, COUNT(*)
+            FROM command_stats
+            WHERE command_name IS NOT NULL
+            GROUP BY 1, 2, 3
+        ''',
+        '''
+            INSERT OR REPLACE INTO command_stats_daily (day, guild_id, command_name, usage_count)
+            SELECT date(used_at), COALESCE(guild_id, 0), command_name, COUNT(*)
+            FROM command_stats
+            WHERE command_name IS NOT NULL
+            GROUP BY 1, 2, 3
+        '''
+    ]),
+    (3, "Enable incremental auto-vacuum for retention", [
+        '''
+            CREATE INDEX IF NOT EXISTS idx_music_history_played
+            ON music_history (played_at)
+        ''',
+        "PRAGMA auto_vacuum = INCREMENTAL",
+        # auto_vacuum only takes effect on an existing database after VACUUM
+        "VACUUM"
+    ], False),
+    (4, "Add persistent music queue snapshots", [
+        # One row per queued track plus the playing one. position is a sparse
+        # ordering key, so a move rewrites a single row
+        '''
+            CREATE TABLE IF NOT EXISTS music_queue_items (
+                guild_id INTEGER NOT NULL,
+                item_id INTEGER NOT NULL,
+                position REAL NOT NULL,
+                title TEXT NOT NULL,
+                webpage_url TEXT,
+                duration INTEGER,
+                thumbnail TEXT,
+                requester_id INTEGER,
+                requester_name TEXT,
+                PRIMARY KEY (guild_id, item_id)
+            )
+        ''',
+        '''
+            CREATE INDEX IF NOT EXISTS idx_music_queue_items_position
+            ON music_queue_items (guild_id, position)
+        ''',
+        '''
+            CREATE TABLE IF NOT EXISTS music_player_state (
+                guild_id INTEGER PRIMARY KEY,
+                volume REAL NOT NULL DEFAULT 0.5,
+                current_item_id INTEGER,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        '''
+    ]),
+]
+
+def get_schema_version(conn):
+    """Get the schema version recorded in the database"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def run_migrations(conn):
+    """Apply all pending migrations, each in its own transaction"""
+    current = get_schema_version(conn)
+    pending = [m for m in MIGRATIONS if m[0] > current]
+
+    if not pending:
+        logger.info(f"Database schema is up to date (version {current})")
+        return current
+
+    for migration in pending:
+        version, description, statements = migration[:3]
+        transactional = migration[3] if len(migration) > 3 else True
+        logger.info(f"Applying migration {version}: {description}")
+        try:
+            if transactional:
+                conn.execute("BEGIN")
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {version}")
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Migration {version} failed: {e}")
+            raise
+        current = version
+
+    logger.info(f"Database schema migrated to version {current}")
+    return current
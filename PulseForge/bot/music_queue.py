@@ -0,0 +1,242 @@
+"""
+Track records and an indexed queue for the music player
+"""
+import random
+
+class Track:
+    """A queued track; holds only plain values, never discord objects"""
+
+    __slots__ = (
+        'title', 'webpage_url', 'url', 'duration', 'thumbnail',
+        'requester_id', 'requester_name', 'expires_at', 'codec', 'item_id', 'position'
+    )
+
+    def __init__(self, title, webpage_url, url='', duration=0, thumbnail=None,
+                 requester_id=0, requester_name='Unknown', expires_at=None, codec=None):
+        self.title = title
+        self.webpage_url = webpage_url
+        self.url = url
+        self.duration = duration
+        self.thumbnail = thumbnail
+        self.requester_id = requester_id
+        self.requester_name = requester_name
+        self.expires_at = expires_at
+        # Audio codec of the stream URL, e.g. 'opus'
+        self.codec = codec
+        # Persistence identity and ordering key, assigned by the player
+        self.item_id = None
+        self.position = None
+
+    @classmethod
+    def from_info(cls, info, requester=None):
+        """Build a track from extracted track info"""
+        return cls(
+            title=info.get('title') or 'Unknown',
+            webpage_url=info.get('webpage_url', ''),
+            url=info.get('url', ''),
+            duration=int(info.get('duration') or 0),
+            thumbnail=info.get('thumbnail'),
+            requester_id=requester.id if requester else 0,
+            requester_name=str(requester) if requester else 'Unknown',
+            expires_at=info.get('expires_at'),
+            codec=info.get('codec')
+        )
+
+    @classmethod
+    def from_saved(cls, row):
+        """Rebuild a track from a saved queue row; its stream URL is resolved on demand"""
+        track = cls(
+            title=row['title'],
+            webpage_url=row['webpage_url'] or '',
+            duration=row['duration'] or 0,
+            thumbnail=row['thumbnail'],
+            requester_id=row['requester_id'] or 0,
+            requester_name=row['requester_name'] or 'Unknown'
+        )
+        track.item_id = row['item_id']
+        track.position = row['position']
+        return track
+
+    def saved_row(self):
+        """Fields persisted for the track; stream URLs expire, so they are not kept"""
+        return (
+            self.item_id, self.position, self.title, self.webpage_url, self.duration,
+            self.thumbnail, self.requester_id, self.requester_name
+        )
+
+    @property
+    def requester_mention(self):
+        return f"<@{self.requester_id}>" if self.requester_id else self.requester_name
+
+    def __repr__(self):
+        return f"Track({self.title!r})"
+
+class _Node:
+    __slots__ = ('track', 'priority', 'size', 'left', 'right')
+
+    def __init__(self, track):
+        self.track = track
+        self.priority = random.random()
+        self.size = 1
+        self.left = None
+        self.right = None
+
+def _size(node):
+    return node.size if node else 0
+
+def _update(node):
+    node.size = 1 + _size(node.left) + _size(node.right)
+
+def _split(node, count):
+    """Split into (first count nodes, the rest)"""
+    if node is None:
+        return None, None
+    if _size(node.left) >= count:
+        left, node.left = _split(node.left, count)
+        _update(node)
+        return left, node
+    node.right, right = _split(node.right, count - _size(node.left) - 1)
+    _update(node)
+    return node, right
+
+def _merge(left, right):
+    """Concatenate two trees"""
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        _update(left)
+        return left
+    right.left = _merge(left, right.left)
+    _update(right)
+    return right
+
+class TrackQueue:
+    """Sequence of tracks backed by an implicit treap
+
+    Indexing, insert, remove and move at any position are O(log n);
+    reading k items from a position is O(log n + k).
+    """
+
+    def __init__(self, tracks=()):
+        self._root = None
+        for track in tracks:
+            self.append(track)
+
+    def __len__(self):
+        return _size(self._root)
+
+    def __bool__(self):
+        return self._root is not None
+
+    def __iter__(self):
+        return self._iter_from(0)
+
+    def __getitem__(self, index):
+        index = self._normalize(index)
+        node = self._root
+        while True:
+            left_size = _size(node.left)
+            if index < left_size:
+                node = node.left
+            elif index == left_size:
+                return node.track
+            else:
+                index -= left_size + 1
+                node = node.right
+
+    def _normalize(self, index):
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("queue index out of range")
+        return index
+
+    def _iter_from(self, start):
+        """In-order traversal starting at position start"""
+        stack = []
+        node = self._root
+        # Descend to the start position, keeping the path of nodes still to visit
+        while node is not None:
+            left_size = _size(node.left)
+            if start < left_size:
+                stack.append(node)
+                node = node.left
+            elif start == left_size:
+                stack.append(node)
+                break
+            else:
+                start -= left_size + 1
+                node = node.right
+
+        while stack:
+            node = stack.pop()
+            yield node.track
+            node = node.right
+            while node is not None:
+                stack.append(node)
+                node = node.left
+
+    def slice(self, start, stop):
+        """Tracks in positions [start, stop), e.g. for one page of the queue"""
+        start = max(start, 0)
+        stop = min(stop, len(self))
+        if start >= stop:
+            return []
+        result = []
+        for track in self._iter_from(start):
+            result.append(track)
+            if len(result) == stop - start:
+                break
+        return result
+
+    def append(self, track):
+        self._root = _merge(self._root, _Node(track))
+
+    def insert(self, index, track):
+        """Insert a track before position index (clamped to the ends)"""
+        index = max(0, min(index, len(self)))
+        left, right = _split(self._root, index)
+        self._root = _merge(_merge(left, _Node(track)), right)
+
+    def pop(self, index=-1):
+        """Remove and return the track at position index"""
+        index = self._normalize(index)
+        left, rest = _split(self._root, index)
+        node, right = _split(rest, 1)
+        self._root = _merge(left, right)
+        return node.track
+
+    def popleft(self):
+        if self._root is None:
+            raise IndexError("pop from an empty queue")
+        return self.pop(0)
+
+    def move(self, source, destination):
+        """Move the track at source so that it ends up at destination"""
+        track = self.pop(source)
+        self.insert(destination, track)
+        return track
+
+    def clear(self):
+        self._root = None
+
+    def shuffle(self):
+        """Shuffle in place by permuting tracks across the existing nodes"""
+        nodes = []
+        stack = []
+        node = self._root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            nodes.append(node)
+            node = node.right
+
+        for i in range(len(nodes) - 1, 0, -1):
+            j = random.randint(0, i)
+            nodes[i].track, nodes[j].track = nodes[j].track, nodes[i].track
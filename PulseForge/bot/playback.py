@@ -0,0 +1,130 @@
+"""
+Audio source metering for comparing playback modes
+"""
+import threading
+import time
+import discord
+import psutil
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Seconds of audio per frame read by the voice client
+FRAME_SECONDS = 0.02
+
+def unwrap(source):
+    """Yield a source and every source it wraps"""
+    while source is not None:
+        yield source
+        source = getattr(source, 'original', None)
+
+def ffmpeg_process(source):
+    """The FFmpeg subprocess feeding a (possibly wrapped) source, if any"""
+    for inner in unwrap(source):
+        if isinstance(inner, discord.FFmpegAudio):
+            return getattr(inner, '_process', None)
+    return None
+
+class MeteredSource(discord.AudioSource):
+    """Wraps a source to measure the CPU its playback session costs
+
+    The voice client reads, encodes and finally cleans up the source on its
+    player thread, so thread CPU time between the first read and cleanup is
+    everything playback cost inside this process. FFmpeg's own CPU time is
+    sampled just before cleanup kills it.
+
+    offset is where in the track the source starts, in seconds. A source
+    replaced mid-song is cleaned up off the player thread, so the player
+    CPU is also checkpointed while reading.
+    """
+
+    # Frames between player CPU checkpoints (one second of audio)
+    CHECKPOINT_FRAMES = 50
+
+    def __init__(self, original, mode, meter, offset=0.0):
+        self.original = original
+        self.mode = mode
+        self.meter = meter
+        self.offset = offset
+        self.frames = 0
+        self._started = None
+        self._player_thread = None
+        self._player_cpu = 0.0
+        self._finished = False
+
+    @property
+    def position(self):
+        """Seconds into the track read so far"""
+        return self.offset + self.frames * FRAME_SECONDS
+
+    def read(self):
+        if self._started is None:
+            self._started = time.thread_time()
+            self._player_thread = threading.get_ident()
+        self.frames += 1
+        if self.frames % self.CHECKPOINT_FRAMES == 0:
+            self._player_cpu = time.thread_time() - self._started
+        return self.original.read()
+
+    def is_opus(self):
+        return self.original.is_opus()
+
+    def cleanup(self):
+        if not self._finished:
+            self._finished = True
+            if self._started is not None and threading.get_ident() == self._player_thread:
+                player_cpu = time.thread_time() - self._started
+            else:
+                player_cpu = self._player_cpu
+            ffmpeg_cpu = 0.0
+            process = ffmpeg_process(self.original)
+            if process is not None:
+                try:
+                    cpu = psutil.Process(process.pid).cpu_times()
+                    ffmpeg_cpu = cpu.user + cpu.system
+                except psutil.Error:
+                    pass
+            self.meter.record(self.mode, self.frames * FRAME_SECONDS, player_cpu, ffmpeg_cpu)
+        self.original.cleanup()
+
+class PlaybackMeter:
+    """Accumulates CPU cost per second of audio for each playback mode"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._modes = {}
+
+    def record(self, mode, audio_seconds, player_cpu, ffmpeg_cpu):
+        """Add a finished playback session"""
+        with self._lock:
+            totals = self._modes.setdefault(mode, {
+                'sessions': 0, 'audio_seconds': 0.0, 'player_cpu': 0.0, 'ffmpeg_cpu': 0.0
+            })
+            totals['sessions'] += 1
+            totals['audio_seconds'] += audio_seconds
+            totals['player_cpu'] += player_cpu
+            totals['ffmpeg_cpu'] += ffmpeg_cpu
+        logger.debug(
+            f"Playback session ({mode}): {audio_seconds:.0f}s audio, "
+            f"player {player_cpu:.2f}s CPU, ffmpeg {ffmpeg_cpu:.2f}s CPU"
+        )
+
+    def get_stats(self):
+        """Get totals per mode, with CPU as a percentage of one core per stream"""
+        stats = {}
+        with self._lock:
+            for mode, totals in self._modes.items():
+                audio = totals['audio_seconds']
+                stats[mode] = {
+                    'sessions': totals['sessions'],
+                    'audio_seconds': round(audio, 1),
+                    'player_cpu_seconds': round(totals['player_cpu'], 3),
+                    'ffmpeg_cpu_seconds': round(totals['ffmpeg_cpu'], 3),
+                    'player_cpu_percent': round(totals['player_cpu'] / audio * 100, 2) if audio else 0.0,
+                    'ffmpeg_cpu_percent': round(totals['ffmpeg_cpu'] / audio * 100, 2) if audio else 0.0,
+                    'total_cpu_percent': round((totals['player_cpu'] + totals['ffmpeg_cpu']) / audio * 100, 2) if audio else 0.0
+                }
+        return stats
+
+# Global meter shared by every guild's player
+playback_meter = PlaybackMeter()
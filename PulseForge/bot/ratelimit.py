@@ -0,0 +1,193 @@
+"""
+GCRA based rate limiting for the command pipeline
+"""
+import sys
+import threading
+import time
+
+class RateLimit:
+    """Allow `rate` requests per `per` seconds, bursting up to `burst`"""
+
+    __slots__ = ('rate', 'per', 'burst', 'interval', 'tolerance')
+
+    def __init__(self, rate, per, burst=None):
+        if rate <= 0 or per <= 0:
+            raise ValueError(f"Rate limit needs a positive rate and period, got {rate}/{per}")
+        if burst is not None and burst < 1:
+            raise ValueError(f"Rate limit burst must be at least 1, got {burst}")
+        self.rate = rate
+        self.per = per
+        self.burst = burst or rate
+        # GCRA emission interval and how far ahead of now a key may run
+        self.interval = per / rate
+        self.tolerance = self.interval * (self.burst - 1)
+
+    @classmethod
+    def parse(cls, spec):
+        """Parse a 'rate/per' spec such as '5/60'"""
+        rate, per = spec.split('/')
+        return cls(int(rate), float(per))
+
+    def __repr__(self):
+        return f"RateLimit({self.rate}/{self.per}s, burst={self.burst})"
+
+class RateLimiter:
+    """Generic cell rate limiter keeping one float per key
+
+    Each key stores its theoretical arrival time (TAT) on the monotonic
+    clock. A key whose TAT has passed is indistinguishable from a new key,
+    so idle keys are dropped by sweeps. The store is capped at max_keys;
+    at the cap the least recently used key is evicted, which at worst
+    lets that key start over with a full burst.
+    """
+
+    def __init__(self, limit, clock=time.monotonic, max_keys=None):
+        self.limit = limit
+        self.clock = clock
+        self.max_keys = max_keys
+        # Insertion ordered: re-inserting on every commit keeps LRU order
+        self._tats = {}
+        self._ops_since_sweep = 0
+        # Bytes per stored key and TAT, measured on the first key; keys of
+        # one limiter share a shape, so usage is estimated from the count
+        self._entry_bytes = 0
+
+        # Store statistics
+        self.expired = 0
+        self.evicted = 0
+
+    def __len__(self):
+        return len(self._tats)
+
+    def peek(self, key, now):
+        """Return (new_tat, retry_after) without recording the request"""
+        tat = self._tats.get(key, now)
+        if tat < now:
+            tat = now
+        retry_after = tat - self.limit.tolerance - now
+        if retry_after > 0:
+            return tat, retry_after
+        return tat + self.limit.interval, 0.0
+
+    def commit(self, key, new_tat):
+        """Record an allowed request"""
+        tats = self._tats
+        if tats.pop(key, None) is None and self.max_keys and len(tats) >= self.max_keys:
+            oldest = next(iter(tats))
+            if tats.pop(oldest) <= self.clock():
+                self.expired += 1
+            else:
+                self.evicted += 1
+        tats[key] = new_tat
+        if not self._entry_bytes:
+            self._entry_bytes = self._measure(key, new_tat)
+
+        self._ops_since_sweep += 1
+        if self._ops_since_sweep >= max(1024, len(tats)):
+            self.sweep(self.clock())
+
+    def hit(self, key):
+        """Record a request; return 0.0 if allowed, else seconds to wait"""
+        now = self.clock()
+        new_tat, retry_after = self.peek(key, now)
+        if not retry_after:
+            self.commit(key, new_tat)
+        return retry_after
+
+    def sweep(self, now):
+        """Drop keys that have fully recovered"""
+        idle = [key for key, tat in self._tats.items() if tat <= now]
+        for key in idle:
+            del self._tats[key]
+        self._ops_since_sweep = 0
+        self.expired += len(idle)
+        return len(idle)
+
+    @staticmethod
+    def _measure(key, tat):
+        size = sys.getsizeof(tat) + sys.getsizeof(key)
+        if isinstance(key, tuple):
+            size += sum(sys.getsizeof(part) for part in key)
+        return size
+
+    def memory_usage(self):
+        """Approximate bytes held by the key store, in constant time"""
+        return sys.getsizeof(self._tats) + len(self._tats) * self._entry_bytes
+
+class RateLimitEngine:
+    """Applies per-command, per-user, per-guild and global limits together"""
+
+    def __init__(self, user_limit, guild_limit=None, global_limit=None, command_limits=None,
+                 clock=time.monotonic, max_keys=None):
+        self.clock = clock
+        self.user = RateLimiter(user_limit, clock, max_keys)
+        self.guild = RateLimiter(guild_limit, clock, max_keys) if guild_limit else None
+        self.global_ = RateLimiter(global_limit, clock) if global_limit else None
+        self.commands = {
+            name: RateLimiter(limit, clock, max_keys)
+            for name, limit in (command_limits or {}).items()
+        }
+        self._lock = threading.Lock()
+
+        # Engine statistics
+        self.allowed = 0
+        self.limited = {'command': 0, 'user': 0, 'guild': 0, 'global': 0}
+
+    def _scopes(self, user_id, guild_id, command_name):
+        """Yield (scope, limiter, key) for every limit that applies"""
+        if command_name in self.commands:
+            yield 'command', self.commands[command_name], (user_id, guild_id)
+        yield 'user', self.user, (user_id, guild_id)
+        if self.guild is not None and guild_id:
+            yield 'guild', self.guild, guild_id
+        if self.global_ is not None:
+            yield 'global', self.global_, None
+
+    def check(self, user_id, guild_id=None, command_name=None):
+        """Return (scope, retry_after) of the first exceeded limit, or (None, 0.0)
+
+        The request only counts against any limit if it passes all of them.
+        """
+        with self._lock:
+            now = self.clock()
+            pending = []
+            for scope, limiter, key in self._scopes(user_id, guild_id, command_name):
+                new_tat, retry_after = limiter.peek(key, now)
+                if retry_after:
+                    self.limited[scope] += 1
+                    return scope, retry_after
+                pending.append((limiter, key, new_tat))
+
+            for limiter, key, new_tat in pending:
+                limiter.commit(key, new_tat)
+            self.allowed += 1
+            return None, 0.0
+
+    def get_limit(self, scope, command_name=None):
+        """Get the RateLimit configured for a scope"""
+        if scope == 'command':
+            return self.commands[command_name].limit
+        return {'user': self.user, 'guild': self.guild, 'global': self.global_}[scope].limit
+
+    def _limiters(self):
+        limiters = [self.user, self.guild, self.global_] + list(self.commands.values())
+        return [limiter for limiter in limiters if limiter is not None]
+
+    def sweep(self):
+        """Drop expired keys from every limiter; returns the number removed"""
+        with self._lock:
+            now = self.clock()
+            return sum(limiter.sweep(now) for limiter in self._limiters())
+
+    def get_stats(self):
+        """Get engine statistics"""
+        with self._lock:
+            limiters = self._limiters()
+            return {
+                'allowed': self.allowed,
+                'limited': dict(self.limited),
+                'tracked_keys': sum(len(limiter) for limiter in limiters),
+                'memory_bytes': sum(limiter.memory_usage() for limiter in limiters),
+                'expired_keys': sum(limiter.expired for limiter in limiters),
+                'evicted_keys': sum(limiter.evicted for limiter in limiters)
+            }
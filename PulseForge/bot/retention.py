@@ -0,0 +1,150 @@
+"""
+Background retention for the raw analytics tables
+"""
+import threading
+import time
+from datetime import datetime
+from utils.logger import setup_logger
+from config import Config
+
+logger = setup_logger(__name__)
+
+class RetentionWorker:
+    """Ages out old rows in small batches and reclaims free pages"""
+
+    def __init__(self, writer_pool):
+        self.writer_pool = writer_pool
+        self.batch_size = Config.RETENTION_BATCH_SIZE
+        self.batch_pause = Config.RETENTION_BATCH_PAUSE
+        self.interval = Config.RETENTION_INTERVAL
+        self.vacuum_pages = Config.RETENTION_VACUUM_PAGES
+
+        # table -> (timestamp column, days kept)
+        self.policies = {
+            'command_stats': ('used_at', Config.RETENTION_COMMAND_STATS_DAYS),
+            'music_history': ('played_at', Config.RETENTION_MUSIC_HISTORY_DAYS),
+            'command_stats_hourly': ('bucket', max(Config.RETENTION_HOURLY_ROLLUP_DAYS, Config.ROLLUP_HOURLY_DAYS + 1))
+        }
+
+        self._stopped = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+        # Retention statistics
+        self.runs = 0
+        self.last_run_at = None
+        self.last_duration = 0.0
+        self.last_error = None
+        self.rows_deleted = {table: 0 for table in self.policies}
+        self.last_rows_deleted = {table: 0 for table in self.policies}
+        self.pages_freed = 0
+
+    def start(self):
+        """Start the retention thread"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name='pulseforge-retention', daemon=True)
+        self._thread.start()
+        logger.info(f"Retention worker started (every {self.interval:.0f}s)")
+
+    def stop(self):
+        """Stop the retention thread after its current batch"""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error(f"Retention run failed: {e}")
+            self._stopped.wait(self.interval)
+
+    def run_once(self):
+        """Apply every retention policy, then run an incremental vacuum"""
+        start = time.perf_counter()
+        deleted = {}
+        for table, (column, days) in self.policies.items():
+            deleted[table] = self._purge(table, column, days)
+            if self._stopped.is_set():
+                break
+
+        freed = self._incremental_vacuum()
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            self.runs += 1
+            self.last_run_at = datetime.utcnow().isoformat()
+            self.last_duration = elapsed
+            self.last_error = None
+            self.pages_freed += freed
+            for table, count in deleted.items():
+                self.rows_deleted[table] += count
+                self.last_rows_deleted[table] = count
+
+        summary = ", ".join(f"{table}={count}" for table, count in deleted.items())
+        logger.info(f"Retention run finished in {elapsed:.2f}s: deleted {summary}; freed {freed} pages")
+        return deleted
+
+    def _purge(self, table, column, days):
+        """Delete rows older than the window, one short transaction per batch"""
+        query = f'''
+            DELETE FROM {table}
+            WHERE rowid IN (
+                SELECT rowid FROM {table}
+                WHERE {column} < datetime('now', ?)
+                LIMIT ?
+            )
+        '''
+        params = (f'-{int(days)} days', self.batch_size)
+
+        total = 0
+        while not self._stopped.is_set():
+            with self.writer_pool.connection() as conn:
+                try:
+                    count = conn.execute(query, params).rowcount
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+
+            total += count
+            if count < self.batch_size:
+                break
+
+            logger.debug(f"Retention: deleted {total} rows from {table} so far")
+            # Let queued writers in between batches
+            time.sleep(self.batch_pause)
+        return total
+
+    def _incremental_vacuum(self):
+        """Return up to vacuum_pages free pages to the filesystem"""
+        with self.writer_pool.connection() as conn:
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                return 0
+
+            before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            # executescript steps the pragma to completion; execute() would
+            # free a single page
+            conn.executescript(f"PRAGMA incremental_vacuum({int(self.vacuum_pages)});")
+            after = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        return before - after
+
+    def get_stats(self):
+        """Get retention statistics"""
+        with self._lock:
+            return {
+                'running': self._thread is not None,
+                'interval': self.interval,
+                'runs': self.runs,
+                'last_run_at': self.last_run_at,
+                'last_duration_ms': round(self.last_duration * 1000, 2),
+                'last_error': self.last_error,
+                'rows_deleted': dict(self.rows_deleted),
+                'last_rows_deleted': dict(self.last_rows_deleted),
+                'pages_freed': self.pages_freed,
+                'retention_days': {table: days for table, (column, days) in self.policies.items()}
+            }
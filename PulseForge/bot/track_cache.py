@@ -0,0 +1,181 @@
+"""
+Shared cache of resolved track metadata for music playback
+"""
+import asyncio
+import re
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlparse, parse_qs
+from config import Config
+
+YOUTUBE_HOSTS = ('youtube.com', 'www.youtube.com', 'm.youtube.com', 'music.youtube.com')
+EXPIRE_PATH = re.compile(r'/expire/(\d+)')
+
+class TrackCache:
+    """LRU cache of extracted tracks that honours stream URL expiry
+
+    Concurrent lookups for the same key share a single resolution.
+    """
+
+    def __init__(self, max_size, ttl, expiry_margin):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.expiry_margin = expiry_margin
+        # key -> (expires_at, track)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight = {}
+
+        # Cache statistics
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.expired = 0
+        self.evictions = 0
+
+    @staticmethod
+    def normalize(query):
+        """Build a cache key from a URL or search query"""
+        query = query.strip()
+        parsed = urlparse(query)
+        if parsed.scheme in ('http', 'https') and parsed.netloc:
+            host = parsed.netloc.lower()
+            if host in YOUTUBE_HOSTS:
+                video_id = parse_qs(parsed.query).get('v', [None])[0]
+                if not video_id and parsed.path.startswith('/shorts/'):
+                    video_id = parsed.path.split('/')[2]
+                if video_id:
+                    return f"youtube:{video_id}"
+            elif host == 'youtu.be' and parsed.path.strip('/'):
+                return f"youtube:{parsed.path.strip('/')}"
+            return f"url:{host}{parsed.path}?{parsed.query}"
+        return "search:" + " ".join(query.lower().split())
+
+    @staticmethod
+    def stream_expiry(url):
+        """Get the expiry timestamp embedded in a stream URL, if any"""
+        if not url:
+            return None
+        parsed = urlparse(url)
+        expire = parse_qs(parsed.query).get('expire', [None])[0]
+        if expire is None:
+            match = EXPIRE_PATH.search(parsed.path)
+            expire = match.group(1) if match else None
+        try:
+            return float(expire) if expire is not None else None
+        except ValueError:
+            return None
+
+    def expires_at(self, track):
+        """When a resolved track must be re-resolved"""
+        expires_at = time.time() + self.ttl
+        stream_expiry = self.stream_expiry(track.get('url'))
+        if stream_expiry is not None:
+            expires_at = min(expires_at, stream_expiry - self.expiry_margin)
+        return expires_at
+
+    def get(self, key):
+        """Get a fresh cached track copy, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, track = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(track)
+
+    def put(self, keys, track):
+        """Cache a resolved track under one or more keys"""
+        expires_at = track.get('expires_at') or self.expires_at(track)
+        if expires_at <= time.time():
+            return
+        track = dict(track, expires_at=expires_at)
+        with self._lock:
+            for key in keys:
+                self._entries[key] = (expires_at, track)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, query):
+        """Drop a cached entry, e.g. after its stream URL stopped working"""
+        with self._lock:
+            self._entries.pop(self.normalize(query), None)
+
+    async def resolve(self, query, resolver):
+        """Return a cached track or resolve it once for all concurrent callers
+
+        resolver is a coroutine function taking the query and returning a
+        track dict or None. Failed resolutions are not cached.
+        """
+        key = self.normalize(query)
+        track = self.get(key)
+        if track is not None:
+            return track
+
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            try:
+                track = await asyncio.shield(future)
+            except Exception:
+                # The resolution we joined was abandoned (e.g. its requester
+                # cancelled it), so resolve on our own behalf
+                return await self.resolve(query, resolver)
+            return dict(track) if track is not None else None
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            track = await resolver(query)
+            if track is not None:
+                track = dict(track, expires_at=self.expires_at(track))
+                keys = [key]
+                if track.get('webpage_url'):
+                    keys.append(self.normalize(track['webpage_url']))
+                self.put(keys, track)
+            future.set_result(track)
+        except asyncio.CancelledError:
+            future.set_exception(RuntimeError("Resolution was cancelled"))
+            future.exception()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so an unawaited failure is not logged as lost
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+        return dict(track) if track is not None else None
+
+    def get_stats(self):
+        """Get cache statistics"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'expired': self.expired,
+                'evictions': self.evictions,
+                'in_flight': len(self._inflight),
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+# Global track cache shared by every guild's player
+track_cache = TrackCache(
+    Config.TRACK_CACHE_SIZE,
+    Config.TRACK_CACHE_TTL,
+    Config.TRACK_CACHE_EXPIRY_MARGIN
+)
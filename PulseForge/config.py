@@ -7,18 +7,82 @@ class Config:
     
     # Web Dashboard Configuration
     SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
+    # Dashboard API responses are reused until new rows are flushed or this expires
+    API_CACHE_TTL = float(os.getenv('API_CACHE_TTL', '15'))  # seconds
+    API_CACHE_MAX_ENTRIES = int(os.getenv('API_CACHE_MAX_ENTRIES', '256'))
+    SYSTEM_SAMPLE_INTERVAL = float(os.getenv('SYSTEM_SAMPLE_INTERVAL', '5'))  # seconds
+    SYSTEM_SAMPLE_HISTORY = int(os.getenv('SYSTEM_SAMPLE_HISTORY', '120'))  # samples kept
+    LIVE_STATE_INTERVAL = float(os.getenv('LIVE_STATE_INTERVAL', '5'))  # seconds between bot snapshots
+    # Live activity is pushed to dashboards in batches at most this often
+    ACTIVITY_BATCH_INTERVAL = float(os.getenv('ACTIVITY_BATCH_INTERVAL', '0.25'))  # seconds
+    ACTIVITY_BATCH_MAX_EVENTS = int(os.getenv('ACTIVITY_BATCH_MAX_EVENTS', '50'))  # older events only count
+    STATS_BROADCAST_INTERVAL = float(os.getenv('STATS_BROADCAST_INTERVAL', '30'))  # seconds
     
     # Database Configuration
     DATABASE_PATH = os.getenv('DATABASE_PATH', 'pulseforge.db')
+    DATABASE_POOL_SIZE = int(os.getenv('DATABASE_POOL_SIZE', '5'))
+    DATABASE_POOL_TIMEOUT = float(os.getenv('DATABASE_POOL_TIMEOUT', '30'))
+    DATABASE_STATEMENT_CACHE = int(os.getenv('DATABASE_STATEMENT_CACHE', '128'))
+    DATABASE_JOURNAL_MODE = os.getenv('DATABASE_JOURNAL_MODE', 'WAL')
+    DATABASE_SYNCHRONOUS = os.getenv('DATABASE_SYNCHRONOUS', 'NORMAL')
+    DATABASE_CACHE_SIZE = int(os.getenv('DATABASE_CACHE_SIZE', '-16000'))  # negative = KiB
+    DATABASE_MMAP_SIZE = int(os.getenv('DATABASE_MMAP_SIZE', '67108864'))  # bytes
+    DATABASE_BUFFER_MAX_ROWS = int(os.getenv('DATABASE_BUFFER_MAX_ROWS', '500'))
+    DATABASE_BUFFER_FLUSH_INTERVAL = float(os.getenv('DATABASE_BUFFER_FLUSH_INTERVAL', '2'))  # seconds
+    SETTINGS_CACHE_SIZE = int(os.getenv('SETTINGS_CACHE_SIZE', '10000'))
+    # Stats windows up to this many days are answered from hourly rollups,
+    # longer ones from daily rollups
+    ROLLUP_HOURLY_DAYS = int(os.getenv('ROLLUP_HOURLY_DAYS', '2'))
+    
+    # Data Retention (raw rows are already folded into the rollups, so only
+    # the dashboard's 7-day raw queries need command_stats to cover a week)
+    RETENTION_COMMAND_STATS_DAYS = int(os.getenv('RETENTION_COMMAND_STATS_DAYS', '30'))
+    RETENTION_MUSIC_HISTORY_DAYS = int(os.getenv('RETENTION_MUSIC_HISTORY_DAYS', '90'))
+    RETENTION_HOURLY_ROLLUP_DAYS = int(os.getenv('RETENTION_HOURLY_ROLLUP_DAYS', '14'))
+    RETENTION_BATCH_SIZE = int(os.getenv('RETENTION_BATCH_SIZE', '1000'))
+    RETENTION_BATCH_PAUSE = float(os.getenv('RETENTION_BATCH_PAUSE', '0.05'))  # seconds
+    RETENTION_INTERVAL = float(os.getenv('RETENTION_INTERVAL', '3600'))  # seconds
+    RETENTION_VACUUM_PAGES = int(os.getenv('RETENTION_VACUUM_PAGES', '2000'))
     
     # Music Configuration
     FFMPEG_OPTIONS = {
         'before_options': '-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5',
         'options': '-vn'
     }
+    EXTRACTION_WORKERS = int(os.getenv('EXTRACTION_WORKERS', '4'))
+    EXTRACTION_TIMEOUT = float(os.getenv('EXTRACTION_TIMEOUT', '30'))  # seconds, queue + run
+    EXTRACTION_MAX_QUEUE = int(os.getenv('EXTRACTION_MAX_QUEUE', '200'))
+    # 'opus' has FFmpeg produce Opus (volume applied by FFmpeg, which restarts at
+    # the current position on a volume change); 'pcm' decodes to PCM and applies
+    # volume in Python
+    MUSIC_PLAYBACK_MODE = os.getenv('MUSIC_PLAYBACK_MODE', 'opus').lower()
+    MUSIC_DEFAULT_VOLUME = int(os.getenv('MUSIC_DEFAULT_VOLUME', '50'))  # percent; only 100 copies Opus untouched
+    MUSIC_PREFETCH_COUNT = int(os.getenv('MUSIC_PREFETCH_COUNT', '2'))  # queued tracks kept resolved
+    MUSIC_PLAYLIST_MAX_TRACKS = int(os.getenv('MUSIC_PLAYLIST_MAX_TRACKS', '500'))
+    TRACK_CACHE_SIZE = int(os.getenv('TRACK_CACHE_SIZE', '2000'))
+    TRACK_CACHE_TTL = float(os.getenv('TRACK_CACHE_TTL', '21600'))  # seconds
+    # Treat stream URLs as expired this long before their embedded expiry
+    TRACK_CACHE_EXPIRY_MARGIN = float(os.getenv('TRACK_CACHE_EXPIRY_MARGIN', '600'))  # seconds
+    # Disconnect from voice after this long with nobody listening / nothing playing
+    VOICE_EMPTY_TIMEOUT = float(os.getenv('VOICE_EMPTY_TIMEOUT', '60'))  # seconds
+    VOICE_IDLE_TIMEOUT = float(os.getenv('VOICE_IDLE_TIMEOUT', '300'))  # seconds
+    VOICE_REAP_INTERVAL = float(os.getenv('VOICE_REAP_INTERVAL', '30'))  # seconds
+    # Opus cache for hot tracks; empty AUDIO_CACHE_DIR disables it
+    AUDIO_CACHE_DIR = os.getenv('AUDIO_CACHE_DIR', '')
+    AUDIO_CACHE_MAX_MB = int(os.getenv('AUDIO_CACHE_MAX_MB', '1024'))
+    AUDIO_CACHE_HOT_PLAYS = int(os.getenv('AUDIO_CACHE_HOT_PLAYS', '3'))  # plays before a track is cached
+    AUDIO_CACHE_MAX_DURATION = int(os.getenv('AUDIO_CACHE_MAX_DURATION', '900'))  # seconds
+    AUDIO_CACHE_BITRATE = os.getenv('AUDIO_CACHE_BITRATE', '128k')
+    AUDIO_CACHE_MAX_JOBS = int(os.getenv('AUDIO_CACHE_MAX_JOBS', '1'))  # concurrent transcodes
     
     # Rate Limiting
-    COMMANDS_PER_MINUTE = int(os.getenv('COMMANDS_PER_MINUTE', '10'))
+    COMMANDS_PER_MINUTE = int(os.getenv('COMMANDS_PER_MINUTE', '10'))  # per user per guild
+    GUILD_COMMANDS_PER_MINUTE = int(os.getenv('GUILD_COMMANDS_PER_MINUTE', '120'))  # 0 disables
+    GLOBAL_COMMANDS_PER_SECOND = int(os.getenv('GLOBAL_COMMANDS_PER_SECOND', '50'))  # 0 disables
+    # Per-command limits per user, e.g. "play=5/60,trivia=3/30" (count/seconds)
+    COMMAND_RATE_LIMITS = os.getenv('COMMAND_RATE_LIMITS', 'play=5/60,playlist=2/60')
+    RATE_LIMIT_MAX_KEYS = int(os.getenv('RATE_LIMIT_MAX_KEYS', '100000'))  # per limiter
+    RATE_LIMIT_SWEEP_INTERVAL = float(os.getenv('RATE_LIMIT_SWEEP_INTERVAL', '60'))  # seconds
     
     # Logging
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
@@ -2,8 +2,10 @@ import asyncio
 import threading
 import os
 from bot.bot import PulseForgeBot
+from bot.database import db
 from web.app import create_app, socketio
 from utils.logger import setup_logger
+from utils.system_monitor import system_sampler
 
 logger = setup_logger(__name__)
 
@@ -30,6 +32,12 @@ def main():
         logger.warning("No DISCORD_TOKEN found. Running web dashboard only.")
         logger.info("To enable Discord bot, set DISCORD_TOKEN environment variable.")
     
+    # Age out old analytics rows in the background
+    db.retention.start()
+    
+    # Sample resource usage for the dashboard
+    system_sampler.start()
+    
     # Start web server in a separate thread
     web_thread = threading.Thread(target=run_web_server, daemon=False)
     web_thread.start()
@@ -5,6 +5,8 @@
 
 // Global variables
 let socket = null;
+let statsSeq = null;
+let subscribedGuildId = null;
 let charts = {};
 let updateIntervals = {};
 
@@ -17,8 +19,10 @@ document.addEventListener('DOMContentLoaded', function() {
  * Initialize the dashboard
  */
 function initializeDashboard() {
-    // Initialize Socket.IO if available
-    if (typeof io !== 'undefined') {
+    // Initialize Socket.IO if available. The dashboard page's Alpine
+    // component keeps its own socket and renders stats and activity itself,
+    // so a second consumer there would apply every batch twice.
+    if (typeof io !== 'undefined' && !document.querySelector('[x-data^="dashboardApp"]')) {
         initializeSocketIO();
     }
     
@@ -44,6 +48,12 @@ function initializeSocketIO() {
         console.log('Connected to server');
         updateConnectionStatus(true);
         
+        // A new connection starts on the all-guilds room with no stats
+        statsSeq = null;
+        if (subscribedGuildId !== null) {
+            socket.emit('subscribe', { guild_id: subscribedGuildId });
+        }
+        
         // Request initial data
         socket.emit('request_stats');
         socket.emit('request_activity');
@@ -56,12 +66,32 @@ function initializeSocketIO() {
     
     socket.on('stats_update', function(data) {
         updateStats(data);
+        acknowledgeStats(data.seq);
+    });
+    
+    // Only the fields changed since the last stats we acknowledged
+    socket.on('stats_delta', function(data) {
+        if (data.base !== statsSeq) {
+            socket.emit('request_stats');
+            return;
+        }
+        updateStats(data.changes);
+        acknowledgeStats(data.seq);
+    });
+    
+    socket.on('subscribed', function(data) {
+        subscribedGuildId = data.guild_id;
+        socket.emit('request_activity');
     });
     
     socket.on('new_activity', function(activity) {
         addNewActivity(activity);
     });
     
+    socket.on('activity_batch', function(batch) {
+        addActivityBatch(batch);
+    });
+    
     socket.on('activity_update', function(data) {
         updateActivityList(data.activities);
     });
@@ -72,6 +102,25 @@ function initializeSocketIO() {
     });
 }
 
+/**
+ * Tell the server which stats version we now show
+ */
+function acknowledgeStats(seq) {
+    if (seq === undefined) return;
+    statsSeq = seq;
+    socket.emit('stats_ack', { seq: seq });
+}
+
+/**
+ * Watch one guild's activity, or every guild with null
+ */
+function subscribeGuild(guildId) {
+    subscribedGuildId = guildId;
+    if (socket && socket.connected) {
+        socket.emit('subscribe', { guild_id: guildId });
+    }
+}
+
 /**
  * Update connection status indicator
  */
@@ -365,6 +414,34 @@ function addNewActivity(activity) {
     activityElement.classList.add('slide-in-right');
 }
 
+/**
+ * Apply a coalesced batch of activity pushed by the server
+ */
+function addActivityBatch(batch) {
+    // Activities arrive newest first; insert oldest first so the newest ends on top
+    (batch.activities || []).slice().reverse().forEach(activity => {
+        addNewActivity(activity);
+    });
+    
+    // A guild's batch only counts that guild, not the bot-wide totals
+    if (batch.guild_id === null || batch.guild_id === undefined) {
+        applyStatDeltas(batch.deltas || {});
+    }
+}
+
+/**
+ * Add counter deltas to the displayed stats
+ */
+function applyStatDeltas(deltas) {
+    ['commands_today', 'total_commands'].forEach(key => {
+        const element = document.querySelector(`[x-text="stats.${key}"]`);
+        if (element && deltas[key]) {
+            const current = parseInt(element.textContent.replace(/,/g, ''), 10) || 0;
+            element.textContent = current + deltas[key];
+        }
+    });
+}
+
 /**
  * Update entire activity list
  */
@@ -561,5 +638,6 @@ window.dashboardUtils = {
     formatTimestamp,
     showNotification,
     updateCommandChart,
+    subscribeGuild,
     debounce
 };
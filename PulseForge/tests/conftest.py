@@ -0,0 +1,13 @@
+import os
+import sys
+import tempfile
+
+# Modules build their globals (database, caches) from Config at import time,
+# so point them at a scratch directory before anything imports them
+_scratch = tempfile.mkdtemp(prefix='pulseforge-tests-')
+os.environ.setdefault('DATABASE_PATH', os.path.join(_scratch, 'pulseforge.db'))
+
+# Loggers write to logs/ under the working directory
+os.chdir(_scratch)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
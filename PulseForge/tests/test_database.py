@@ -0,0 +1,35 @@
+import sqlite3
+import pytest
+from bot.database import db, WriteBuffer
+
+def count_rows(table):
+    conn = sqlite3.connect(db.db_path)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        conn.close()
+
+def test_flush_keeps_rows_when_writer_is_busy():
+    buffer = WriteBuffer(db.writer_pool, max_rows=500, flush_interval=60)
+    before = count_rows('command_stats')
+    buffer.add('command_stats', (1, 2, 'ping', '2026-01-01 00:00:00'))
+
+    timeout = db.writer_pool.timeout
+    db.writer_pool.timeout = 0.2
+    held = db.writer_pool.acquire()
+    try:
+        with pytest.raises(TimeoutError):
+            buffer.flush()
+    finally:
+        db.writer_pool.release(held)
+        db.writer_pool.timeout = timeout
+
+    stats = buffer.get_stats()
+    assert stats['depth'] == 1
+    assert stats['failed_flushes'] == 1
+    assert stats['rows_dropped'] == 0
+
+    assert buffer.flush() == 1
+    assert buffer.get_stats()['depth'] == 0
+    assert count_rows('command_stats') == before + 1
+    buffer.stop()
@@ -0,0 +1,21 @@
+from bot.event_bus import ActivityBus
+
+GUILD_ID = 1180000000000000123  # above 2**53, like real Discord ids
+
+def test_batches_carry_ids_as_strings():
+    bus = ActivityBus(max_events=10)
+    bus.publish('command', command='play', guild_id=GUILD_ID, user_id=GUILD_ID + 1)
+    bus.publish('command', command='skip', guild_id=None, user_id=5)
+
+    everything, guilds = bus.drain()
+    assert set(guilds) == {GUILD_ID}
+
+    payload = guilds[GUILD_ID].payload(GUILD_ID)
+    assert payload['guild_id'] == str(GUILD_ID)
+    assert payload['activities'][0]['guild_id'] == str(GUILD_ID)
+    assert payload['activities'][0]['user_id'] == str(GUILD_ID + 1)
+    assert payload['deltas']['commands'] == {'play': 1}
+
+    assert everything.payload()['guild_id'] is None
+    assert everything.payload()['deltas']['commands_today'] == 2
+    assert bus.drain() is None
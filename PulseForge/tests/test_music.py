@@ -0,0 +1,193 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+from bot.cogs.music import Music
+from bot.database import db
+from bot.music_queue import Track
+from config import Config
+
+GUILD_ID = 1234
+
+class FakeVoiceClient:
+    """Voice client that runs the after callback on another thread when stopped"""
+
+    def __init__(self, guild_id, members=()):
+        self.guild = SimpleNamespace(id=guild_id)
+        self.channel = SimpleNamespace(members=list(members))
+        self.source = None
+        self.after = None
+        self.playing = False
+        self.connected = True
+
+    def play(self, source, after=None):
+        self.source, self.after = source, after
+        self.playing = True
+
+    def is_playing(self):
+        return self.playing
+
+    def is_paused(self):
+        return False
+
+    def is_connected(self):
+        return self.connected
+
+    def stop(self):
+        after, self.source, self.after = self.after, None, None
+        self.playing = False
+        if after:
+            thread = threading.Thread(target=after, args=(None,))
+            thread.start()
+            thread.join()
+
+    async def disconnect(self):
+        self.connected = False
+
+def make_cog(loop):
+    bot = SimpleNamespace(loop=loop, voice_clients=[], is_closed=lambda: False)
+    return Music(bot)
+
+def start_playing(cog, voice_client, monkeypatch):
+    player = cog.get_player(GUILD_ID)
+    player.voice_client = voice_client
+    monkeypatch.setattr(player, 'create_source', lambda cached_path=None: object())
+    player.add_to_queue(Track('Song', 'https://example.com/song', url='https://cdn/song', duration=60))
+    player.start()
+    return player
+
+def player_tasks():
+    return [
+        task for task in asyncio.all_tasks()
+        if not task.done() and getattr(task.get_coro(), '__qualname__', '').startswith('MusicPlayer.')
+    ]
+
+def test_destroy_player_leaves_no_event_task(monkeypatch):
+    history = []
+
+    async def record_history(*args, **kwargs):
+        history.append(args)
+
+    monkeypatch.setattr(db, 'aadd_music_history', record_history)
+
+    async def scenario():
+        cog = make_cog(asyncio.get_running_loop())
+        voice_client = FakeVoiceClient(GUILD_ID)
+        start_playing(cog, voice_client, monkeypatch)
+        await asyncio.sleep(0.05)
+        assert voice_client.is_playing()
+
+        await cog.destroy_player(GUILD_ID, voice_client)
+        await asyncio.sleep(0.05)
+
+        assert GUILD_ID not in cog.players
+        assert player_tasks() == []
+        assert history == []
+
+    asyncio.run(scenario())
+
+def test_reap_idle_frees_empty_and_orphaned_players(monkeypatch):
+    monkeypatch.setattr(Config, 'VOICE_EMPTY_TIMEOUT', 0)
+    monkeypatch.setattr(Config, 'VOICE_IDLE_TIMEOUT', 0)
+    monkeypatch.setattr(db, 'defer_write', lambda *args: None)
+
+    async def scenario():
+        cog = make_cog(asyncio.get_running_loop())
+        voice_client = FakeVoiceClient(GUILD_ID)
+        cog.bot.voice_clients.append(voice_client)
+        start_playing(cog, voice_client, monkeypatch)
+        orphan = cog.get_player(GUILD_ID + 1)
+        orphan.start()
+        await asyncio.sleep(0.05)
+
+        await cog.reap_idle.coro(cog)
+        await asyncio.sleep(0.05)
+
+        assert cog.players == {}
+        assert player_tasks() == []
+        assert not voice_client.is_connected()
+        assert cog.reaped['empty'] == 1
+        assert cog.reaped['orphaned'] == 1
+
+    asyncio.run(scenario())
+
+class FakeOpusAudio:
+    """Stands in for FFmpegOpusAudio, recording how FFmpeg would be run"""
+
+    def __init__(self, path, codec=None, before_options=None, options=None):
+        self.path = path
+        self.codec = codec
+        self.before_options = before_options
+        self.options = options
+        self.cleaned_up = False
+
+    def read(self):
+        return b'\x00'
+
+    def is_opus(self):
+        return True
+
+    def cleanup(self):
+        self.cleaned_up = True
+
+def test_volume_changes_restart_opus_in_place(monkeypatch):
+    monkeypatch.setattr('bot.cogs.music.discord.FFmpegOpusAudio', FakeOpusAudio)
+    monkeypatch.setattr(Config, 'MUSIC_PLAYBACK_MODE', 'opus')
+    monkeypatch.setattr(db, 'defer_write', lambda *args: None)
+
+    async def scenario():
+        cog = make_cog(asyncio.get_running_loop())
+        player = cog.get_player(GUILD_ID)
+        player.voice_client = voice_client = FakeVoiceClient(GUILD_ID)
+        player.current = Track('Song', 'https://example.com/song', url='https://cdn/song', duration=60, codec='opus')
+
+        source = player.create_source()
+        assert player.volume == 0.5
+        assert source.mode == 'opus-filter'
+        voice_client.play(source)
+        for _ in range(500):
+            source.read()
+
+        assert player.set_volume(1.0)
+        restarted = voice_client.source
+        assert restarted.mode == 'opus-copy'
+        assert restarted.original.before_options.startswith('-ss 10.00 ')
+
+        # Once playback has ended no new FFmpeg is started
+        voice_client.playing = False
+        assert player.set_volume(0.3)
+        assert voice_client.source is restarted
+
+        player.cleanup()
+
+    asyncio.run(scenario())
+
+def test_commands_during_restore_wait_for_saved_item_ids(monkeypatch):
+    saved = [{
+        'item_id': item_id, 'position': float(item_id), 'title': f'Saved {item_id}',
+        'webpage_url': f'https://example.com/{item_id}', 'duration': 60, 'thumbnail': None,
+        'requester_id': 1, 'requester_name': 'someone'
+    } for item_id in (1, 2, 3)]
+    writes = []
+    monkeypatch.setattr(db, 'defer_write', lambda *args: writes.append(args))
+
+    async def slow_load(guild_id):
+        await asyncio.sleep(0.05)
+        return None, saved
+
+    monkeypatch.setattr(db, 'aload_saved_queue', slow_load)
+
+    async def scenario():
+        cog = make_cog(asyncio.get_running_loop())
+        player = cog.get_player(GUILD_ID)
+
+        async def command():
+            await player.restore()
+            player.add_to_queue(Track('New', 'https://example.com/new'))
+
+        await asyncio.gather(player.restore(), command())
+
+        item_ids = [track.item_id for track in player.queue]
+        assert item_ids == [1, 2, 3, 4]
+        assert writes[-1][2][0][0] == 4
+
+    asyncio.run(scenario())
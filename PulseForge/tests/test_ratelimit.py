@@ -0,0 +1,34 @@
+import pytest
+from bot.bot import PulseForgeBot
+from bot.ratelimit import RateLimit, RateLimitEngine
+from config import Config
+
+@pytest.mark.parametrize('spec', ['0/60', '-1/60', '5/0', '5/-60'])
+def test_parse_rejects_non_positive_limits(spec):
+    with pytest.raises(ValueError):
+        RateLimit.parse(spec)
+
+def test_rejects_burst_below_one():
+    with pytest.raises(ValueError):
+        RateLimit(5, 60, burst=-1)
+
+def test_create_rate_limiter_skips_bad_entries(monkeypatch):
+    monkeypatch.setattr(Config, 'COMMAND_RATE_LIMITS', 'x=0/60,y=-2/60,play=5/60')
+    monkeypatch.setattr(Config, 'COMMANDS_PER_MINUTE', 0)
+    monkeypatch.setattr(Config, 'GUILD_COMMANDS_PER_MINUTE', -1)
+
+    engine = PulseForgeBot.create_rate_limiter()
+
+    assert set(engine.commands) == {'play'}
+    assert engine.get_limit('user').rate == 10
+    assert engine.guild is None
+
+def test_memory_estimate_tracks_key_count():
+    engine = RateLimitEngine(RateLimit(5, 60), guild_limit=RateLimit(1000, 60))
+    for user_id in range(1000):
+        engine.check(user_id, guild_id=user_id % 10 + 1)
+
+    stats = engine.get_stats()
+    assert stats['tracked_keys'] == 1000 + 10
+    per_key = engine.user.memory_usage() / len(engine.user)
+    assert 50 < per_key < 500
@@ -0,0 +1,46 @@
+from flask import Flask
+from flask_socketio import SocketIO
+from bot import live_state
+from bot.database import db
+from web import socketio_events
+
+def make_client(socketio, app):
+    client = socketio.test_client(app)
+    client.get_received()
+    return client
+
+def test_stats_pushes_carry_commands_today_to_every_room(monkeypatch):
+    usage = [{'usage_count': 4}]
+    monkeypatch.setattr(db, 'get_command_stats', lambda guild_id=None, days=7: usage)
+    monkeypatch.setattr(live_state, '_current', live_state.OFFLINE)
+
+    app = Flask(__name__)
+    socketio = SocketIO(app)
+    socketio_events.register_socketio_events(socketio)
+
+    acknowledged = make_client(socketio, app)
+    acknowledged.emit('subscribe', {'guild_id': '1180000000000000123'})
+    acknowledged.emit('request_stats')
+    full = [message for message in acknowledged.get_received() if message['name'] == 'stats_update'][0]['args'][0]
+    assert full['commands_today'] == 4
+    acknowledged.emit('stats_ack', {'seq': full['seq']})
+
+    # Guild viewer that never acknowledged anything
+    fresh = make_client(socketio, app)
+    fresh.emit('subscribe', {'guild_id': '7'})
+    fresh.get_received()
+
+    usage[0]['usage_count'] = 6
+    socketio_events.push_stats(socketio)
+
+    delta = acknowledged.get_received()[0]
+    assert delta['name'] == 'stats_delta'
+    assert delta['args'][0]['base'] == full['seq']
+    assert delta['args'][0]['changes'] == {'commands_today': 6}
+
+    update = fresh.get_received()[0]
+    assert update['name'] == 'stats_update'
+    assert update['args'][0]['commands_today'] == 6
+
+    acknowledged.disconnect()
+    fresh.disconnect()
@@ -0,0 +1,125 @@
+"""
+Background sampling of system and process resource usage
+"""
+import os
+import threading
+from collections import deque
+from datetime import datetime
+import psutil
+from utils.logger import setup_logger
+from config import Config
+
+logger = setup_logger(__name__)
+
+class SystemSampler:
+    """Samples system and process metrics on a fixed cadence into a ring buffer
+
+    CPU percentages are measured between consecutive samples, so nothing
+    ever blocks waiting for a CPU interval.
+    """
+
+    def __init__(self, interval, history_size):
+        self.interval = interval
+        self.history = deque(maxlen=history_size)
+        self.process = psutil.Process(os.getpid())
+        self._stopped = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+        # Prime the counters; the first reading of each is meaningless
+        psutil.cpu_percent(interval=None)
+        self.process.cpu_percent(interval=None)
+
+    def start(self):
+        """Start the sampling thread"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name='pulseforge-sampler', daemon=True)
+        self._thread.start()
+        logger.info(f"System sampler started (every {self.interval:.0f}s)")
+
+    def stop(self):
+        """Stop the sampling thread"""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                self.sample()
+            except Exception as e:
+                logger.error(f"Error sampling system metrics: {e}")
+            self._stopped.wait(self.interval)
+
+    def sample(self):
+        """Take one sample and append it to the history"""
+        memory = psutil.virtual_memory()
+        disk = psutil.disk_usage('/')
+
+        with self.process.oneshot():
+            rss = self.process.memory_info().rss
+            threads = self.process.num_threads()
+            process_cpu = self.process.cpu_percent(interval=None)
+            if hasattr(self.process, 'num_fds'):
+                open_fds = self.process.num_fds()
+            else:
+                open_fds = self.process.num_handles()
+
+        ffmpeg = 0
+        ffmpeg_rss = 0
+        for child in self.process.children(recursive=True):
+            try:
+                if 'ffmpeg' in child.name().lower():
+                    ffmpeg += 1
+                    ffmpeg_rss += child.memory_info().rss
+            except psutil.Error:
+                # Exited between listing and inspection
+                continue
+
+        sample = {
+            'timestamp': datetime.utcnow().isoformat(),
+            'cpu_percent': psutil.cpu_percent(interval=None),
+            'memory_percent': memory.percent,
+            'memory_used': memory.used // 1024 // 1024,  # MB
+            'memory_total': memory.total // 1024 // 1024,  # MB
+            'disk_percent': round(disk.used / disk.total * 100, 1),
+            'disk_used': disk.used // 1024 // 1024 // 1024,  # GB
+            'disk_total': disk.total // 1024 // 1024 // 1024,  # GB
+            'process': {
+                'cpu_percent': process_cpu,
+                'rss': rss // 1024 // 1024,  # MB
+                'threads': threads,
+                'open_fds': open_fds,
+                'ffmpeg_processes': ffmpeg,
+                'ffmpeg_rss': ffmpeg_rss // 1024 // 1024  # MB
+            }
+        }
+        with self._lock:
+            self.history.append(sample)
+        return sample
+
+    def latest(self):
+        """Most recent sample, taking one if none exists yet"""
+        with self._lock:
+            if self.history:
+                return self.history[-1]
+        return self.sample()
+
+    def get_history(self):
+        """Compact series of recent samples, oldest first, for sparklines"""
+        with self._lock:
+            return [
+                {
+                    'timestamp': sample['timestamp'],
+                    'cpu_percent': sample['cpu_percent'],
+                    'memory_percent': sample['memory_percent'],
+                    'rss': sample['process']['rss'],
+                    'ffmpeg_processes': sample['process']['ffmpeg_processes']
+                }
+                for sample in self.history
+            ]
+
+# Global sampler shared by the bot and the dashboard
+system_sampler = SystemSampler(Config.SYSTEM_SAMPLE_INTERVAL, Config.SYSTEM_SAMPLE_HISTORY)
@@ -30,8 +30,9 @@ def create_app():
     app.register_blueprint(main)
     
     # Register SocketIO events
-    from web.socketio_events import register_socketio_events
+    from web.socketio_events import register_socketio_events, start_stats_broadcaster
     register_socketio_events(socketio)
+    start_stats_broadcaster(socketio)
     
     logger.info("Flask app created and configured")
     return app
@@ -0,0 +1,116 @@
+"""
+Response cache with conditional GET support for the dashboard API
+"""
+import functools
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from flask import current_app, request
+from config import Config
+
+class CachedResponse:
+    """A rendered response body and the data version it was built from"""
+
+    __slots__ = ('version', 'created', 'body', 'mimetype', 'etag', 'last_modified')
+
+    def __init__(self, version, body, mimetype, etag, last_modified):
+        self.version = version
+        self.created = time.monotonic()
+        self.body = body
+        self.mimetype = mimetype
+        self.etag = etag
+        self.last_modified = last_modified
+
+class ResponseCache:
+    """Caches successful GET responses per URL
+
+    An entry is reused until its TTL expires or the data version it was
+    built from changes. Responses carry an ETag and Last-Modified, so
+    clients polling unchanged data get a 304 without a body.
+    """
+
+    def __init__(self, ttl, max_entries):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Cache statistics
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def cached(self, version=None, ttl=None):
+        """Decorate a view; version is a callable returning the current data version"""
+        def decorator(view):
+            @functools.wraps(view)
+            def wrapper(*args, **kwargs):
+                return self._respond(view, args, kwargs, version() if version else None, ttl or self.ttl)
+            return wrapper
+        return decorator
+
+    def _respond(self, view, args, kwargs, version, ttl):
+        key = request.full_path
+        with self._lock:
+            entry = self._entries.get(key)
+            fresh = entry is not None and entry.version == version and time.monotonic() - entry.created < ttl
+            if fresh:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        if not fresh:
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+
+            body = response.get_data()
+            etag = hashlib.sha1(body).hexdigest()
+            # Unchanged content keeps its Last-Modified across rebuilds
+            if entry is not None and entry.etag == etag:
+                last_modified = entry.last_modified
+            else:
+                last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+            entry = CachedResponse(version, body, response.mimetype, etag, last_modified)
+
+            with self._lock:
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+        response = current_app.response_class(entry.body, mimetype=entry.mimetype)
+        response.set_etag(entry.etag)
+        response.last_modified = entry.last_modified
+        # Let browsers keep the body but revalidate on every poll
+        response.cache_control.no_cache = True
+        response = response.make_conditional(request)
+        if response.status_code == 304:
+            with self._lock:
+                self.not_modified += 1
+        return response
+
+    def clear(self):
+        """Drop every cached response"""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self):
+        """Get cache statistics"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'not_modified': self.not_modified,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+# Global response cache for the dashboard API
+response_cache = ResponseCache(Config.API_CACHE_TTL, Config.API_CACHE_MAX_ENTRIES)
@@ -1,13 +1,25 @@
 from flask import Blueprint, render_template, jsonify, request
 from datetime import datetime, timedelta
+from bot import live_state
 from bot.database import db
+from bot.event_bus import snowflake
+from web.cache import response_cache
 from utils.logger import setup_logger
+from utils.system_monitor import system_sampler
 import json
 
 logger = setup_logger(__name__)
 
 main = Blueprint('main', __name__)
 
+def command_stats_version():
+    """Changes whenever buffered command rows reach the database"""
+    return db.write_buffer.versions['command_stats']
+
+def live_stats_version():
+    """Changes with new command rows or a new bot snapshot"""
+    return command_stats_version(), live_state.current().published_at
+
 @main.route('/')
 def index():
     """Home page"""
@@ -19,28 +31,20 @@ def dashboard():
     return render_template('dashboard.html')
 
 @main.route('/api/stats')
+@response_cache.cached(version=live_stats_version)
 def api_stats():
     """Get bot statistics"""
     try:
         # Get command statistics
         command_stats = db.get_command_stats(days=7)
+        commands_today = db.get_command_stats(days=1)
         
-        # Get total commands used
-        total_commands = sum(stat['usage_count'] for stat in command_stats)
-        
-        # Get server count (this would come from the bot instance in a real setup)
-        # For now, we'll get unique guild_ids from the database
-        guild_query = "SELECT COUNT(DISTINCT guild_id) as server_count FROM command_stats"
-        server_result = db.execute_query(guild_query)
-        server_count = server_result[0]['server_count'] if server_result else 0
-        
-        stats = {
-            'servers': server_count,
-            'total_commands': total_commands,
-            'commands_today': 0,  # Would need to calculate from today's data
-            'uptime': '0h 0m 0s',  # Would come from bot instance
-            'status': 'online'
-        }
+        # Servers, users, uptime and status come from the bot's live snapshot
+        stats = live_state.current().summary()
+        stats.update({
+            'total_commands': sum(stat['usage_count'] for stat in command_stats),
+            'commands_today': sum(stat['usage_count'] for stat in commands_today)
+        })
         
         return jsonify(stats)
     except Exception as e:
@@ -48,6 +52,7 @@ def api_stats():
         return jsonify({'error': 'Failed to get statistics'}), 500
 
 @main.route('/api/command-usage')
+@response_cache.cached(version=command_stats_version)
 def api_command_usage():
     """Get command usage statistics"""
     try:
@@ -67,6 +72,7 @@ def api_command_usage():
         return jsonify({'error': 'Failed to get command usage'}), 500
 
 @main.route('/api/servers')
+@response_cache.cached(version=live_stats_version)
 def api_servers():
     """Get server list with basic info"""
     try:
@@ -81,13 +87,17 @@ def api_servers():
             LIMIT 10
         """
         results = db.execute_query(query)
+        guilds = live_state.current().guilds
         
         servers = []
         for result in results:
+            guild = guilds.get(result['guild_id'])
             servers.append({
-                'id': result['guild_id'],
-                'name': f"Server {result['guild_id']}",  # Would get real name from bot
-                'members': 0,  # Would get from bot
+                'id': snowflake(result['guild_id']),
+                'name': guild.name if guild else f"Server {result['guild_id']}",
+                'icon_url': guild.icon_url if guild else None,
+                'members': guild.member_count if guild else 0,
+                'voice_connected': guild.voice_connected if guild else False,
                 'active_users': result['active_users'],
                 'commands_used': result['total_commands']
             })
@@ -98,6 +108,7 @@ def api_servers():
         return jsonify({'error': 'Failed to get servers'}), 500
 
 @main.route('/api/recent-activity')
+@response_cache.cached(version=command_stats_version)
 def api_recent_activity():
     """Get recent bot activity"""
     try:
@@ -116,8 +127,8 @@ def api_recent_activity():
                 'id': result['id'],
                 'type': 'command',
                 'command': result['command_name'],
-                'user_id': result['user_id'],
-                'guild_id': result['guild_id'],
+                'user_id': snowflake(result['user_id']),
+                'guild_id': snowflake(result['guild_id']),
                 'timestamp': result['used_at']
             })
         
@@ -214,29 +225,49 @@ def update_server_settings(guild_id):
         logger.error(f"Error updating server settings: {e}")
         return jsonify({'error': 'Failed to update server settings'}), 500
 
+@main.route('/api/database-stats')
+def api_database_stats():
+    """Get database pool, buffer, cache and retention statistics"""
+    try:
+        return jsonify({
+            'journal_mode': db.journal_mode,
+            'schema_version': db.schema_version,
+            'pools': db.get_pool_stats(),
+            'write_buffer': db.write_buffer.get_stats(),
+            'settings_cache': db.settings_cache.get_stats(),
+            'retention': db.retention.get_stats(),
+            'response_cache': response_cache.get_stats()
+        })
+    except Exception as e:
+        logger.error(f"Error getting database stats: {e}")
+        return jsonify({'error': 'Failed to get database statistics'}), 500
+
+@main.route('/api/rate-limits')
+def api_rate_limits():
+    """Get rate limit engine statistics from the live snapshot"""
+    try:
+        state = live_state.current()
+        return jsonify({
+            'published_at': state.published_at,
+            **state.rate_limits
+        })
+    except Exception as e:
+        logger.error(f"Error getting rate limit stats: {e}")
+        return jsonify({'error': 'Failed to get rate limit statistics'}), 500
+
 @main.route('/api/system-info')
 def api_system_info():
-    """Get system information"""
+    """Get the latest system sample and recent history"""
     try:
-        import psutil
         import platform
         
-        # Get system info
-        cpu_percent = psutil.cpu_percent(interval=1)
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage('/')
-        
-        system_info = {
+        system_info = dict(system_sampler.latest())
+        system_info.update({
             'platform': platform.system(),
             'python_version': platform.python_version(),
-            'cpu_percent': cpu_percent,
-            'memory_percent': memory.percent,
-            'memory_used': memory.used // 1024 // 1024,  # MB
-            'memory_total': memory.total // 1024 // 1024,  # MB
-            'disk_percent': (disk.used / disk.total) * 100,
-            'disk_used': disk.used // 1024 // 1024 // 1024,  # GB
-            'disk_total': disk.total // 1024 // 1024 // 1024,  # GB
-        }
+            'sample_interval': system_sampler.interval,
+            'history': system_sampler.get_history()
+        })
         
         return jsonify(system_info)
     except Exception as e:
@@ -2,13 +2,131 @@ from flask_socketio import emit, disconnect
 from datetime import datetime
 import threading
 import time
+from collections import Counter, OrderedDict
 from utils.logger import setup_logger
+from bot import live_state
 from bot.database import db
+from bot.event_bus import activity_bus, snowflake
+from config import Config
 
 logger = setup_logger(__name__)
 
-# Store active connections
-active_connections = set()
+# Everyone not watching a particular guild
+ALL_ROOM = 'dashboard'
+
+# Stats states kept for computing deltas against
+STATS_HISTORY = 16
+
+_broadcaster_lock = threading.Lock()
+_broadcaster_started = False
+
+def guild_room(guild_id):
+    """Room carrying one guild's activity"""
+    return f"guild:{guild_id}"
+
+class DashboardClient:
+    """One dashboard connection: what it watches and the stats it has"""
+
+    __slots__ = ('guild_id', 'stats_seq')
+
+    def __init__(self):
+        self.guild_id = None
+        self.stats_seq = None
+
+    @property
+    def room(self):
+        return ALL_ROOM if self.guild_id is None else guild_room(self.guild_id)
+
+class DashboardClients:
+    """Connected dashboards and how many watch each room"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clients = {}
+        self._viewers = Counter()
+
+    def __len__(self):
+        return len(self._clients)
+
+    def add(self, sid):
+        with self._lock:
+            self._clients[sid] = DashboardClient()
+            self._viewers[ALL_ROOM] += 1
+
+    def remove(self, sid):
+        with self._lock:
+            client = self._clients.pop(sid, None)
+            if client is not None:
+                self._release(client.room)
+
+    def get(self, sid):
+        with self._lock:
+            return self._clients.get(sid)
+
+    def subscribe(self, sid, guild_id):
+        """Point a client at a guild (None for all); returns (old_room, new_room)"""
+        with self._lock:
+            client = self._clients[sid]
+            old_room = client.room
+            client.guild_id = guild_id
+            new_room = client.room
+            if new_room != old_room:
+                self._release(old_room)
+                self._viewers[new_room] += 1
+            return old_room, new_room
+
+    def acknowledge(self, sid, seq):
+        """Record the stats version a client has applied"""
+        with self._lock:
+            client = self._clients.get(sid)
+            if client is not None:
+                client.stats_seq = seq
+
+    def watched(self, room):
+        with self._lock:
+            return self._viewers[room] > 0
+
+    def acknowledged(self):
+        """(sid, stats_seq) for every client"""
+        with self._lock:
+            return [(sid, client.stats_seq) for sid, client in self._clients.items()]
+
+    def _release(self, room):
+        self._viewers[room] -= 1
+        if self._viewers[room] <= 0:
+            del self._viewers[room]
+
+class StatsVersions:
+    """Recent stats states by sequence number
+
+    Clients acknowledge the sequence they have applied, and each update is
+    sent as only the fields that changed since then. A client whose state
+    has aged out, or who never acknowledged one, gets everything again.
+    """
+
+    def __init__(self, keep):
+        self.keep = keep
+        self.seq = 0
+        self._states = OrderedDict()
+        self._lock = threading.Lock()
+
+    def publish(self, state):
+        """Record a state, returning its sequence number"""
+        with self._lock:
+            if self._states.get(self.seq) != state:
+                self.seq += 1
+                self._states[self.seq] = state
+                while len(self._states) > self.keep:
+                    self._states.popitem(last=False)
+            return self.seq
+
+    def get(self, seq):
+        with self._lock:
+            return self._states.get(seq)
+
+# Connected dashboards and the stats states sent to them
+clients = DashboardClients()
+stats_versions = StatsVersions(STATS_HISTORY)
 
 def register_socketio_events(socketio):
     """Register SocketIO event handlers"""
@@ -17,7 +135,9 @@ def register_socketio_events(socketio):
     def handle_connect():
         """Handle client connection"""
         from flask import request
-        active_connections.add(request.sid)
+        from flask_socketio import join_room
+        clients.add(request.sid)
+        join_room(ALL_ROOM)
         logger.info(f"Client connected: {request.sid}")
         emit('status', {'message': 'Connected to PulseForge Dashboard'})
     
@@ -25,164 +145,211 @@ def register_socketio_events(socketio):
     def handle_disconnect():
         """Handle client disconnection"""
         from flask import request
-        active_connections.discard(request.sid)
+        clients.remove(request.sid)
         logger.info(f"Client disconnected: {request.sid}")
     
+    def subscribe(guild_id):
+        """Move the current client to one guild's room, or back to everything"""
+        from flask import request
+        from flask_socketio import join_room, leave_room
+        old_room, new_room = clients.subscribe(request.sid, guild_id)
+        if new_room != old_room:
+            leave_room(old_room)
+            join_room(new_room)
+        emit('subscribed', {'guild_id': snowflake(guild_id), 'room': new_room})
+    
+    @socketio.on('subscribe')
+    def handle_subscribe(data):
+        """Handle watching one guild's activity (guild_id null for all guilds)"""
+        guild_id = (data or {}).get('guild_id')
+        if guild_id in (None, ''):
+            subscribe(None)
+            return
+        try:
+            subscribe(int(guild_id))
+        except (TypeError, ValueError):
+            emit('error', {'message': f'Invalid guild id: {guild_id}'})
+    
     @socketio.on('join_room')
     def handle_join_room(data):
         """Handle joining a room (e.g., for server-specific updates)"""
-        from flask_socketio import join_room
-        room = data.get('room')
-        if room:
-            join_room(room)
-            emit('status', {'message': f'Joined room: {room}'})
+        room = (data or {}).get('room')
+        if room == ALL_ROOM:
+            subscribe(None)
+        elif room and room.startswith('guild:') and room[6:].isdigit():
+            subscribe(int(room[6:]))
+        else:
+            emit('error', {'message': f'Unknown room: {room}'})
     
     @socketio.on('leave_room')
     def handle_leave_room(data):
         """Handle leaving a room"""
-        from flask_socketio import leave_room
-        room = data.get('room')
-        if room:
-            leave_room(room)
-            emit('status', {'message': f'Left room: {room}'})
+        from flask import request
+        client = clients.get(request.sid)
+        room = (data or {}).get('room')
+        if client is not None and room == client.room and client.guild_id is not None:
+            subscribe(None)
     
     @socketio.on('request_stats')
     def handle_request_stats():
         """Handle request for current stats"""
         try:
-            # Get basic stats
-            command_stats = db.get_command_stats(days=1)
-            total_commands_today = sum(stat['usage_count'] for stat in command_stats)
-            
-            stats = {
-                'timestamp': datetime.utcnow().isoformat(),
-                'servers': 0,  # Would come from bot instance
-                'users': 0,   # Would come from bot instance
-                'commands_today': total_commands_today,
-                'uptime': '0h 0m 0s',  # Would come from bot instance
-                'status': 'online'
-            }
-            
-            emit('stats_update', stats)
+            emit('stats_update', build_stats())
         except Exception as e:
             logger.error(f"Error sending stats: {e}")
             emit('error', {'message': 'Failed to get statistics'})
     
+    @socketio.on('stats_ack')
+    def handle_stats_ack(data):
+        """Handle a client confirming which stats version it has applied"""
+        from flask import request
+        seq = (data or {}).get('seq')
+        if isinstance(seq, int):
+            clients.acknowledge(request.sid, seq)
+    
     @socketio.on('request_activity')
     def handle_request_activity():
-        """Handle request for recent activity"""
+        """Handle request for recent activity in the client's guild, or all guilds"""
+        from flask import request
         try:
-            query = """
-                SELECT command_name, guild_id, user_id, used_at
-                FROM command_stats
-                ORDER BY used_at DESC
-                LIMIT 10
-            """
-            results = db.execute_query(query)
+            client = clients.get(request.sid)
+            guild_id = client.guild_id if client is not None else None
+            if guild_id is None:
+                query = """
+                    SELECT command_name, guild_id, user_id, used_at
+                    FROM command_stats
+                    ORDER BY used_at DESC
+                    LIMIT 10
+                """
+                results = db.execute_query(query)
+            else:
+                query = """
+                    SELECT command_name, guild_id, user_id, used_at
+                    FROM command_stats
+                    WHERE guild_id = ?
+                    ORDER BY used_at DESC
+                    LIMIT 10
+                """
+                results = db.execute_query(query, (guild_id,))
             
             activities = []
             for result in results:
                 activities.append({
                     'type': 'command',
                     'command': result['command_name'],
-                    'guild_id': result['guild_id'],
-                    'user_id': result['user_id'],
+                    'guild_id': snowflake(result['guild_id']),
+                    'user_id': snowflake(result['user_id']),
                     'timestamp': result['used_at']
                 })
             
-            emit('activity_update', {'activities': activities})
+            emit('activity_update', {'activities': activities, 'guild_id': snowflake(guild_id)})
         except Exception as e:
             logger.error(f"Error sending activity: {e}")
             emit('error', {'message': 'Failed to get recent activity'})
 
-def broadcast_command_used(command_name, guild_id, user_id):
-    """Broadcast when a command is used"""
-    if not active_connections:
-        return
-    
-    try:
-        from web.app import socketio
-        
-        activity = {
-            'type': 'command',
-            'command': command_name,
-            'guild_id': guild_id,
-            'user_id': user_id,
-            'timestamp': datetime.utcnow().isoformat()
-        }
-        
-        socketio.emit('new_activity', activity)
-        logger.debug(f"Broadcasted command usage: {command_name}")
-    except Exception as e:
-        logger.error(f"Error broadcasting command usage: {e}")
-
-def broadcast_member_joined(guild_id, user_id):
-    """Broadcast when a member joins a server"""
-    if not active_connections:
-        return
-    
-    try:
-        from web.app import socketio
-        
-        activity = {
-            'type': 'member_join',
-            'guild_id': guild_id,
-            'user_id': user_id,
-            'timestamp': datetime.utcnow().isoformat()
-        }
-        
-        socketio.emit('new_activity', activity)
-        logger.debug(f"Broadcasted member join: {user_id}")
-    except Exception as e:
-        logger.error(f"Error broadcasting member join: {e}")
-
-def broadcast_member_left(guild_id, user_id):
-    """Broadcast when a member leaves a server"""
-    if not active_connections:
-        return
-    
-    try:
-        from web.app import socketio
-        
-        activity = {
-            'type': 'member_leave',
-            'guild_id': guild_id,
-            'user_id': user_id,
-            'timestamp': datetime.utcnow().isoformat()
-        }
-        
-        socketio.emit('new_activity', activity)
-        logger.debug(f"Broadcasted member leave: {user_id}")
-    except Exception as e:
-        logger.error(f"Error broadcasting member leave: {e}")
+def current_stats():
+    """Headline stats: bot state from the live snapshot, usage from the rollups
+    
+    This is the versioned state deltas are computed against, so every
+    client, whichever room it watches, gets commands_today from it.
+    """
+    command_stats = db.get_command_stats(days=1)
+    
+    stats = live_state.current().summary()
+    stats['commands_today'] = sum(stat['usage_count'] for stat in command_stats)
+    return stats
+
+def build_stats():
+    """Full headline stats
+    
+    Carries the stats version as seq; a client acknowledging it gets later
+    updates as deltas.
+    """
+    state = current_stats()
+    stats = dict(state)
+    stats.update({
+        'seq': stats_versions.publish(state),
+        'timestamp': datetime.utcnow().isoformat()
+    })
+    return stats
+
+def stats_message(base_seq, seq, state):
+    """The update taking a client from base_seq to seq: (event, payload) or None"""
+    base = stats_versions.get(base_seq) if base_seq is not None else None
+    if base is None:
+        stats = dict(state)
+        stats.update({'seq': seq, 'timestamp': datetime.utcnow().isoformat()})
+        return 'stats_update', stats
+    
+    changes = {key: value for key, value in state.items() if base.get(key) != value}
+    if not changes:
+        return None
+    return 'stats_delta', {'base': base_seq, 'seq': seq, 'changes': changes}
+
+def push_stats(socketio):
+    """Send every client the stats fields changed since its acknowledged version"""
+    # One rollup query per push, shared by every client's message
+    state = current_stats()
+    seq = stats_versions.publish(state)
+    
+    # Clients mostly share a base version, so build each message once
+    messages = {}
+    for sid, base_seq in clients.acknowledged():
+        if base_seq == seq:
+            continue
+        if base_seq not in messages:
+            messages[base_seq] = stats_message(base_seq, seq, state)
+        message = messages[base_seq]
+        if message is not None:
+            socketio.emit(message[0], message[1], to=sid)
+
+def push_activity(socketio, drained):
+    """Send a drained bus batch to the rooms watching it"""
+    everything, guilds = drained
+    if clients.watched(ALL_ROOM):
+        socketio.emit('activity_batch', everything.payload(), to=ALL_ROOM)
+    
+    for guild_id, batch in guilds.items():
+        room = guild_room(guild_id)
+        if clients.watched(room):
+            socketio.emit('activity_batch', batch.payload(guild_id), to=room)
 
 def start_stats_broadcaster(socketio):
-    """Start background thread to broadcast stats periodically"""
-    def broadcast_stats():
+    """Start the background thread pushing live activity and stats to dashboards
+    
+    Activity comes from the bot's event bus and is sent as one
+    'activity_batch' per ACTIVITY_BATCH_INTERVAL to each room with viewers:
+    the whole batch to the dashboard room and each guild's share to that
+    guild's room. Stats go out as per-client deltas every
+    STATS_BROADCAST_INTERVAL, costing one rollup query per push.
+    """
+    global _broadcaster_started
+    with _broadcaster_lock:
+        if _broadcaster_started:
+            return
+        _broadcaster_started = True
+    
+    def broadcast():
+        last_stats = time.monotonic()
         while True:
             try:
-                if active_connections:
-                    # Get current stats
-                    command_stats = db.get_command_stats(days=1)
-                    total_commands_today = sum(stat['usage_count'] for stat in command_stats)
-                    
-                    stats = {
-                        'timestamp': datetime.utcnow().isoformat(),
-                        'servers': 0,  # Would come from bot instance
-                        'users': 0,   # Would come from bot instance
-                        'commands_today': total_commands_today,
-                        'uptime': '0h 0m 0s',  # Would come from bot instance
-                        'status': 'online'
-                    }
-                    
-                    socketio.emit('stats_update', stats)
+                time.sleep(Config.ACTIVITY_BATCH_INTERVAL)
+                
+                # Drain even with nobody listening so batches never go stale
+                drained = activity_bus.drain()
+                if drained and len(clients):
+                    push_activity(socketio, drained)
                 
-                time.sleep(30)  # Update every 30 seconds
+                now = time.monotonic()
+                if now - last_stats >= Config.STATS_BROADCAST_INTERVAL:
+                    last_stats = now
+                    if len(clients):
+                        push_stats(socketio)
             except Exception as e:
                 logger.error(f"Error in stats broadcaster: {e}")
-                time.sleep(60)  # Wait longer on error
+                time.sleep(5)  # Back off on error
     
     # Start broadcaster thread
-    stats_thread = threading.Thread(target=broadcast_stats, daemon=True)
+    stats_thread = threading.Thread(target=broadcast, name='pulseforge-broadcaster', daemon=True)
     stats_thread.start()
     logger.info("Stats broadcaster started")